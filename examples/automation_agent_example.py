@@ -1,7 +1,8 @@
-from dynamic_agent_generator import AgentGenerator
+import sys
+from dynamic_agent_generator import get_generator
 
 def main():
-    generator = AgentGenerator()
+    generator = get_generator()
     
     requirements = """
     Create an automation agent that can:
@@ -11,8 +12,9 @@ def main():
     """
     
     output_dir = "./automation_agents"
-    result = generator.generate_agent(requirements, output_dir)
-    print(result)
+    for chunk in generator.generate_agent_stream(requirements, output_dir):
+        sys.stdout.write(chunk)
+    print()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,9 +1,10 @@
-from dynamic_agent_generator import AgentGenerator
+import sys
+from dynamic_agent_generator import get_generator
 
 def main():
     # Initialize the generator
-    generator = AgentGenerator()
-    
+    generator = get_generator()
+
     # Example requirements
     requirements = """
     Create an agent that can perform image generation tasks.
@@ -12,7 +13,7 @@ def main():
     - Modify existing images
     - Handle different art styles
     """
-    
+
     # Generate the agent with proper structure
     output_dir = "./generated_agents"
     result = generator.generate_agent(
@@ -22,5 +23,49 @@ def main():
     )
     print(result)
 
+def batch_main():
+    # Several agents can also be generated with one generation run
+    # sharing the same instructions
+    generator = get_generator()
+
+    # Example requirements, one per agent to generate
+    jobs = [
+        (
+            """
+            Create a machine learning agent that can:
+            - Train and evaluate ML models
+            - Perform model inference
+            """,
+            "./generated_agents/ml_agent"
+        ),
+        (
+            """
+            Create a data processing agent that can:
+            - Clean and transform data
+            - Generate visualizations
+            """,
+            "./generated_agents/data_agent"
+        ),
+        (
+            """
+            Create a web automation agent that can:
+            - Scrape web content
+            - Handle API interactions
+            """,
+            "./generated_agents/web_agent"
+        ),
+    ]
+
+    results = generator.generate_agents(
+        [{"requirements": requirements, "output_dir": output_dir} for requirements, output_dir in jobs],
+        custom_max_steps=20  # Optional: Set higher steps for complex generation
+    )
+    for result in results:
+        print(result)
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    # python generate_agent_example.py --batch runs the batched demo
+    if "--batch" in sys.argv[1:]:
+        batch_main()
+    else:
+        main()
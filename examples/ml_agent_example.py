@@ -1,7 +1,8 @@
-from dynamic_agent_generator import AgentGenerator
+import sys
+from dynamic_agent_generator import get_generator
 
 def main():
-    generator = AgentGenerator()
+    generator = get_generator()
     
     requirements = """
     Create a machine learning agent that can:
@@ -12,12 +13,13 @@ def main():
     """
     
     output_dir = "./generated_agents/ml_agent"
-    result = generator.generate_agent(
+    for chunk in generator.generate_agent_stream(
         requirements=requirements,
         output_dir=output_dir,
         custom_max_steps=25  # ML tasks might need more steps
-    )
-    print(result)
+    ):
+        sys.stdout.write(chunk)
+    print()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
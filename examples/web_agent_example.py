@@ -1,7 +1,8 @@
-from dynamic_agent_generator import AgentGenerator
+import sys
+from dynamic_agent_generator import get_generator
 
 def main():
-    generator = AgentGenerator()
+    generator = get_generator()
     
     requirements = """
     Create a web automation agent that can:
@@ -12,11 +13,12 @@ def main():
     """
     
     output_dir = "./generated_agents/web_agent"
-    result = generator.generate_agent(
+    for chunk in generator.generate_agent_stream(
         requirements=requirements,
         output_dir=output_dir
-    )
-    print(result)
+    ):
+        sys.stdout.write(chunk)
+    print()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -12,6 +12,21 @@ requirements = [
     "black>=23.0.0",
 ]
 
+# Optional features, e.g. pip install "dynamic-agent-generator[speedups,search]"
+extras_require = {
+    # Faster JSON (falls back to the json module)
+    "speedups": ["orjson>=3.9.0"],
+    # Faster web research: DuckDuckGo's JSON API, fast HTML parsing without
+    # lxml, single-pass matching of Space ranking terms
+    "search": ["duckduckgo-search>=6.0.0", "selectolax>=0.3.17", "pyahocorasick>=2.0.0"],
+    # Semantic cache (AgentGenerator(semantic_cache=True))
+    "semantic-cache": ["sentence-transformers>=2.2.0", "numpy>=1.24.0"],
+    # Local quantized models (AgentGenerator(backend="vllm")); Linux + CUDA only
+    "vllm": ["vllm>=0.6.0"],
+    # OpenAI-compatible inference server (AGENT_BACKEND=openai)
+    "openai": ["openai>=1.0.0"],
+}
+
 setup(
     name="dynamic-agent-generator",
     version="0.1.0",
@@ -35,6 +50,7 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=requirements,
+    extras_require=extras_require,
     entry_points={
         "console_scripts": [
             "generate-agent=dynamic_agent_generator.cli:main",
@@ -1,8 +1,24 @@
-from .agent_generator import AgentGenerator
-from .tools.tool_generator import generate_tool
-from .tools.space_tool_generator import generate_space_tool
-
 __version__ = "0.1.0"
 
 # Make AgentGenerator available at package root level
-__all__ = ["AgentGenerator", "generate_tool", "generate_space_tool"] 
\ No newline at end of file
+__all__ = ["AgentGenerator", "get_generator", "generate_tool", "generate_space_tool"]
+
+# Public names are resolved lazily (PEP 562) so importing the package does
+# not pull in smolagents until one of them is actually used.
+_LAZY_ATTRS = {
+    "AgentGenerator": ".agent_generator",
+    "get_generator": ".agent_generator",
+    "generate_tool": ".tools.tool_generator",
+    "generate_space_tool": ".tools.space_tool_generator",
+}
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
\ No newline at end of file
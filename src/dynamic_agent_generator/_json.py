@@ -0,0 +1,30 @@
+import json
+
+# orjson is an optional speedup; fall back to the standard library without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Shared standard-library codecs (compact output, matching orjson's)
+_DECODER = json.JSONDecoder()
+_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+_PRETTY_ENCODER = json.JSONEncoder(indent=2, ensure_ascii=False)
+
+def loads(data):
+    """Parse JSON from str or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray)):
+        return json.loads(data)
+    return _DECODER.decode(data)
+
+def dumps(obj, pretty: bool = False) -> str:
+    """Serialize obj to a JSON string, indented by 2 spaces if pretty"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0).decode()
+        except TypeError:
+            # e.g. non-string dict keys; let the standard library handle those
+            pass
+    return (_PRETTY_ENCODER if pretty else _ENCODER).encode(obj)
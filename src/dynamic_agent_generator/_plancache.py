@@ -0,0 +1,97 @@
+import hashlib
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from ._json import dumps, loads
+from ._semcache import DEFAULT_CACHE_DIR
+
+# Lightweight keyword classifier for recurring requirement shapes
+_CATEGORY_KEYWORDS = {
+    "image_generation": ("stable diffusion", "image generation", "generate images", "text-to-image", "art style"),
+    "vision": ("image classification", "ocr", "object detection", "extract text from images"),
+    "data": ("csv", "sql", "dataframe", "data processing", "data analysis", "visualization"),
+    "web": ("scrap", "html", "web automation", "api interactions", "web sessions"),
+    "nlp": ("nlp", "translation", "summar", "text analysis", "language"),
+    "ml": ("machine learning", "ml models", "model inference", "train"),
+    "automation": ("automation", "schedul", "file operations", "system tasks"),
+}
+
+class PlanCache:
+    """Cache of successful generation plans keyed by requirement category
+
+    A plan records the tools the analysis suggested and the capabilities that
+    were searched for. On a hit, the Space searches are prefetched in the
+    background while the LLM analyzes the requirements.
+    """
+
+    def __init__(self, path: str = os.path.join(DEFAULT_CACHE_DIR, "plans.json"), ttl: int = 24 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self._executor = None
+        # Serializes put()'s load-modify-write between concurrent generations
+        self._lock = threading.Lock()
+
+    def classify(self, requirements: str) -> Optional[str]:
+        """Return a stable key for the requirement categories, or None if unrecognized"""
+        text = requirements.lower()
+        categories = sorted(
+            category for category, keywords in _CATEGORY_KEYWORDS.items()
+            if any(keyword in text for keyword in keywords)
+        )
+        if not categories:
+            return None
+        return hashlib.sha256(",".join(categories).encode()).hexdigest()
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return loads(f.read())
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached plan for key unless it has expired"""
+        plan = self._load().get(key)
+        if plan is None or time.time() - plan.get("created", 0) > self.ttl:
+            return None
+        return plan
+
+    def put(self, key: str, tool_names: List[str], space_queries: List[str]):
+        """Record a successful plan"""
+        with self._lock:
+            plans = self._load()
+            plans[key] = {
+                "tool_names": tool_names,
+                "space_queries": space_queries,
+                "created": time.time()
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # Swap the file in atomically so a crash never leaves it truncated
+            tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(dumps(plans))
+            os.replace(tmp_path, self.path)
+
+    def prefetch(self, plan: Dict) -> Future:
+        """Start searching Spaces for the plan's queries in a background thread"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        return self._executor.submit(self._search, plan)
+
+    def _search(self, plan: Dict) -> Dict:
+        from .tools.search_tools import search_huggingface_spaces
+
+        spaces = {}
+        for query in plan.get("space_queries", []):
+            try:
+                spaces[query] = loads(search_huggingface_spaces.forward(query=query)).get("results", [])
+            except Exception:
+                continue
+        return {
+            "tool_names": plan.get("tool_names", []),
+            "spaces": spaces
+        }
@@ -0,0 +1,126 @@
+import functools
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+from ._json import dumps, loads
+from ._semcache import DEFAULT_CACHE_DIR
+
+_TTL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+# Number of striped locks serializing fills of the same key
+_LOCK_STRIPES = 64
+
+def _parse_ttl(ttl) -> int:
+    """Convert a TTL such as 3600, "12h" or "7d" to seconds"""
+    if isinstance(ttl, int):
+        return ttl
+    return int(ttl[:-1]) * _TTL_UNITS[ttl[-1]]
+
+class ResponseCache:
+    """Exact-match cache for LLM responses
+
+    Entries live in a local SQLite database by default, or in Redis when a
+    redis_url is given. Keys are spread over a fixed set of locks, so
+    concurrent identical requests wait for the first one instead of calling
+    the LLM twice.
+    """
+
+    def __init__(self, path: str = os.path.join(DEFAULT_CACHE_DIR, "responses.sqlite"), redis_url: Optional[str] = None):
+        self.path = path
+        self._redis = None
+        if redis_url:
+            import redis
+            self._redis = redis.Redis.from_url(redis_url)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with sqlite3.connect(path) as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT, expires REAL)"
+                )
+        # Reentrant, so a cached call nested in another never waits on its own stripe
+        self._locks = [threading.RLock() for _ in range(_LOCK_STRIPES)]
+
+    @staticmethod
+    def key(**parts) -> str:
+        """Deterministic key for the given key parts"""
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+    def lock(self, key: str) -> threading.RLock:
+        """Lock serializing fills of key (shared with the keys in the same stripe)"""
+        # Keys are hex SHA-256 digests, so any slice of them is uniform
+        return self._locks[int(key[:8], 16) % _LOCK_STRIPES]
+
+    def get(self, key: str) -> Optional[str]:
+        if self._redis is not None:
+            value = self._redis.get(key)
+            return value.decode() if value is not None else None
+        with sqlite3.connect(self.path) as conn:
+            row = conn.execute(
+                "SELECT value FROM responses WHERE key = ? AND expires > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, ttl: int):
+        if self._redis is not None:
+            self._redis.set(key, value, ex=ttl)
+            return
+        with sqlite3.connect(self.path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl)
+            )
+
+def llm_cached(ttl, tag: str, model_attr: str = "model_id", key_attrs: Tuple[str, ...] = ()):
+    """
+    Cache a method's JSON-serializable result on its first argument
+
+    The owning object enables caching by setting a ResponseCache as
+    self._response_cache. The key covers the model id, the whitespace-normalized
+    input, tag and the key_attrs settings of the object that change how the
+    result is produced, so bump the tag whenever the prompt template changes.
+    Results with status "error" are never cached. The wrapper's cached(self,
+    text) returns a cached result without calling the method, or None.
+    """
+    seconds = _parse_ttl(ttl)
+
+    def decorator(method):
+        def key_for(cache: ResponseCache, self, text: str) -> str:
+            return cache.key(
+                model=getattr(self, model_attr),
+                req=re.sub(r"\s+", " ", text).strip(),
+                tag=tag,
+                **{attr: getattr(self, attr) for attr in key_attrs}
+            )
+
+        @functools.wraps(method)
+        def wrapper(self, text: str, *args, **kwargs):
+            cache = getattr(self, "_response_cache", None)
+            if cache is None:
+                return method(self, text, *args, **kwargs)
+
+            key = key_for(cache, self, text)
+            with cache.lock(key):
+                cached = cache.get(key)
+                if cached is not None:
+                    return loads(cached)
+
+                result = method(self, text, *args, **kwargs)
+                if not (isinstance(result, dict) and result.get("status") == "error"):
+                    cache.set(key, dumps(result), seconds)
+                return result
+
+        def cached(self, text: str):
+            cache = getattr(self, "_response_cache", None)
+            if cache is None:
+                return None
+            value = cache.get(key_for(cache, self, text))
+            return loads(value) if value is not None else None
+
+        wrapper.cached = cached
+        return wrapper
+    return decorator
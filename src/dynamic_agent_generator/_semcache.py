@@ -0,0 +1,118 @@
+import os
+import shutil
+import uuid
+from typing import Callable, Dict, Optional
+
+from ._json import dumps, loads
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "dynamic_agent_generator")
+DEFAULT_EMBED_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+class SemanticCache:
+    """On-disk cache keyed by requirement embeddings
+
+    Entries are looked up by cosine similarity of the requirements text, so
+    identical or near-duplicate requests can reuse an earlier generation (or
+    analysis) instead of driving the LLM through the pipeline again.
+
+    Scores at or above threshold are hits. If threshold_skip is set, scores
+    between threshold_skip and threshold are a gray zone where lookup() asks
+    a verify callback whether the cached requirements have the same intent.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        embed_model: str = DEFAULT_EMBED_MODEL,
+        namespace: str = "semantic",
+        threshold_skip: Optional[float] = None
+    ):
+        self.threshold = threshold
+        self.threshold_skip = threshold_skip
+        self.cache_dir = os.path.join(cache_dir, namespace)
+        self.embed_model = embed_model
+        self._encoder = None
+        self._embeddings = None
+        self._entries = None
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.cache_dir, "embeddings.npy")
+
+    @property
+    def _entries_path(self) -> str:
+        return os.path.join(self.cache_dir, "entries.json")
+
+    def _encode(self, text: str):
+        """Embed text as a unit-length vector"""
+        if self._encoder is None:
+            # Imported lazily: only needed when the cache is enabled
+            from sentence_transformers import SentenceTransformer
+            self._encoder = SentenceTransformer(self.embed_model)
+        return self._encoder.encode(text.strip(), normalize_embeddings=True)
+
+    def _load(self):
+        """Load the persisted index on first use"""
+        import numpy as np
+
+        if self._entries is not None:
+            return
+        if os.path.exists(self._index_path) and os.path.exists(self._entries_path):
+            self._embeddings = np.load(self._index_path)
+            with open(self._entries_path, "r", encoding="utf-8") as f:
+                self._entries = loads(f.read())
+        else:
+            self._embeddings = None
+            self._entries = []
+
+    def lookup(self, requirements: str, verify: Optional[Callable[[str], bool]] = None) -> Optional[Dict]:
+        """Return the closest cached entry if it is similar enough to requirements"""
+        self._load()
+        if not self._entries:
+            return None
+
+        scores = self._embeddings @ self._encode(requirements)
+        best = int(scores.argmax())
+        entry = self._entries[best]
+        if scores[best] >= self.threshold:
+            return entry
+        if (
+            self.threshold_skip is not None
+            and scores[best] >= self.threshold_skip
+            and verify is not None
+            and verify(entry["requirements"])
+        ):
+            return entry
+        return None
+
+    def restore(self, entry: Dict, output_dir: str) -> str:
+        """Copy cached agent artifacts to output_dir and return the cached result"""
+        shutil.copytree(entry["artifact_dir"], output_dir, dirs_exist_ok=True)
+        result = loads(entry["result"])
+        result["agent_dir"] = output_dir
+        result["cached"] = True
+        return dumps(result)
+
+    def store(self, requirements: str, agent_dir: str, result: str):
+        """Snapshot a generated agent and index it under its requirements"""
+        artifact_dir = os.path.join(self.cache_dir, "artifacts", uuid.uuid4().hex)
+        shutil.copytree(agent_dir, artifact_dir)
+        self.add(requirements, artifact_dir=artifact_dir, result=result)
+
+    def add(self, requirements: str, **payload):
+        """Index an arbitrary JSON-serializable payload under requirements"""
+        import numpy as np
+
+        self._load()
+        embedding = self._encode(requirements)[np.newaxis, :]
+        if self._embeddings is None:
+            self._embeddings = embedding
+        else:
+            self._embeddings = np.vstack([self._embeddings, embedding])
+        self._entries.append({"requirements": requirements, **payload})
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        np.save(self._index_path, self._embeddings)
+        with open(self._entries_path, "w", encoding="utf-8") as f:
+            f.write(dumps(self._entries))
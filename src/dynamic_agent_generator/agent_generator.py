@@ -1,35 +1,82 @@
-from smolagents import CodeAgent, HfApiModel, Tool, DuckDuckGoSearchTool
-from .tools.tool_generator import generate_tool
-from .tools.agent_structure_generator import generate_agent_structure
-from .tools.dependency_tools import install_dependencies, check_dependencies
-import json
+from ._semcache import SemanticCache
+from ._plancache import PlanCache
+from ._response_cache import ResponseCache, llm_cached
+from ._json import dumps, loads
+import ast
+import asyncio
+import functools
 import os
-from typing import List, Dict, Optional
+import re
+import string
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterator, List, Dict, Optional, TYPE_CHECKING
 
-class AgentGenerator:
-    def __init__(self, model_id="Qwen/Qwen2.5-Coder-32B-Instruct", hf_token=None, max_steps=10):
-        self.model = HfApiModel(model_id=model_id)
-        self.hf_token = hf_token
-        self.agent = CodeAgent(
-            tools=[
-                generate_tool,
-                generate_agent_structure,
-                install_dependencies,
-                check_dependencies,
-            ],
-            model=self.model,
-            max_steps=max_steps,
-            additional_authorized_imports=[
-                "os", "black", "smolagents", 
-                "subprocess", "sys", "pkg_resources", "json"
-            ]
-        )
+if TYPE_CHECKING:
+    from smolagents import CodeAgent
 
-    def _analyze_requirements(self, requirements: str) -> Dict:
-        """Get LLM suggestions for agent generation steps"""
-        analysis_prompt = f"""
-        Based on these requirements, suggest a detailed plan for generating a new AI agent:
-        {requirements}
+
+# smolagents and the tool modules are heavy to import, so they are only
+# loaded once an agent is actually built (see _build_tools/_build_agent).
+
+DEFAULT_MODEL_ID = "Qwen/Qwen2.5-Coder-32B-Instruct"
+# Smaller model used for requirement analysis / tool planning
+DEFAULT_PLANNER_MODEL_ID = "mistralai/Mistral-7B-Instruct-v0.3"
+# OpenAI-compatible endpoint (e.g. a vLLM or TGI server) used by backend="openai"
+DEFAULT_API_BASE = "http://localhost:8000/v1"
+
+# Static instructions for the generation run. Kept free of any interpolation
+# so every call sends the exact same prefix.
+PROMPT_PREAMBLE = """
+        Follow these steps to generate a new AI agent.
+
+        Use these tools as needed:
+        - generate_tool: Create custom tools
+        - generate_agent_structure: Create agent directory structure
+        - install_dependencies: Handle package dependencies
+        - check_dependencies: Verify package installations
+
+        Execute each step in the generation_steps sequence, ensuring to:
+        1. Follow the exact order of steps
+        2. Use the specified tool for each step
+        3. Follow the detailed instructions for each step
+        4. Handle any errors appropriately
+        5. Report progress after each step
+
+        Return a JSON response with:
+        {
+            "status": "success/error",
+            "message": "Status message",
+            "agent_dir": "Path to generated agent",
+            "steps_completed": ["List of completed steps"],
+            "generated_tools": ["List of generated tools"],
+            "errors": ["Any errors encountered"]
+        }
+
+        The requirements, analysis and output directory of each agent follow.
+        """
+
+# Static step 0 instructions for fused runs (AgentGenerator(fuse_analysis=True)),
+# appended to the preamble so the prefix stays identical between calls
+_FUSED_PROMPT_PREAMBLE = PROMPT_PREAMBLE + """
+        No analysis is given for these agents. As step 0, analyze the
+        requirements yourself: decide the required capabilities, the custom
+        tools to generate and the generation steps, then execute those steps.
+        The directory structure already exists in the output directory, do not
+        create it again. Add your analysis to the JSON response as
+        "analysis": {"required_capabilities": [...], "suggested_tools": [...]}
+        """
+# Per-agent stand-ins for the analysis fragments in fused runs
+_FUSED_ANALYSIS_FRAGMENTS = {
+    "analysis": "Not provided, see step 0",
+    "generation_steps": "[]",
+    "additional_considerations": "[]",
+}
+
+# Static part of the requirement-analysis prompt; the requirements are
+# appended at the end so the whole prefix stays identical between calls.
+_ANALYSIS_PROMPT_PREFIX = """
+        Suggest a detailed plan for generating a new AI agent from the requirements
+        given at the end of this prompt.
 
         IMPORTANT: The generation steps MUST follow this exact order:
         1. First step MUST be creating the directory structure using generate_agent_structure
@@ -40,45 +87,12 @@ class AgentGenerator:
         2. What file operations might be needed
         3. What system operations might be needed
         
-        Your response should be a JSON object with this structure:
-        {{
-            "analysis": {{
-                "required_capabilities": [
-                    "List of all required capabilities"
-                ],
-                "suggested_tools": [
-                    {{
-                        "name": "tool_name",
-                        "purpose": "what this tool will do",
-                        "type": "custom",  # custom only
-                        "implementation": {{
-                            "type": "custom"
-                        }}
-                    }}
-                ],
-                "architecture_decisions": [
-                    "Key decisions about agent structure"
-                ]
-            }},
-            "generation_steps": [
-                {{
-                    "step": 1,
-                    "action": "Create agent directory structure",
-                    "tool": "generate_agent_structure",
-                    "details": "Set up the base directory structure for the agent"
-                }},
-                {{
-                    "step": 2,
-                    "action": "specific_action",
-                    "tool": "tool_to_use",
-                    "details": "detailed instructions for this step"
-                }},
-                # ... additional steps ...
-            ],
-            "additional_considerations": [
-                "Important points to consider during generation"
-            ]
-        }}
+        Your response should be a single-line JSON object using these short keys:
+        {"c":["required capability"],"t":[{"n":"tool_name","p":"what this tool will do"}],"d":["key decision about agent structure"],"s":[{"a":"Create agent directory structure","u":"generate_agent_structure","x":"Set up the base directory structure for the agent"},{"a":"specific_action","u":"tool_to_use","x":"detailed instructions for this step"}],"k":["important point to consider during generation"]}
+
+        Legend: c = required capabilities, t = suggested custom tools (n = name,
+        p = purpose), d = architecture decisions, s = generation steps in order
+        (a = action, u = tool to use, x = details), k = additional considerations.
 
         Guidelines:
         1. ALWAYS create directory structure as step 1
@@ -90,20 +104,371 @@ class AgentGenerator:
         - generate_agent_structure: Create agent directory structure
         - install_dependencies: Handle package dependencies
         - check_dependencies: Verify package installations
+
+        While planning you can research existing Hugging Face Spaces for the
+        required capabilities. Call search_and_validate_spaces once with all
+        capabilities rather than search_huggingface_spaces and validate_space
+        for each of them.
+        """
+
+def _string_list() -> Dict:
+    return {"type": "array", "items": {"type": "string"}}
+
+# JSON Schema of the compact analysis answer, for constrained decoding
+# (constrained_analysis=True)
+_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "c": _string_list(),
+        "t": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"n": {"type": "string"}, "p": {"type": "string"}},
+                "required": ["n", "p"]
+            }
+        },
+        "d": _string_list(),
+        "s": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"a": {"type": "string"}, "u": {"type": "string"}, "x": {"type": "string"}},
+                "required": ["a", "u", "x"]
+            }
+        },
+        "k": _string_list()
+    },
+    "required": ["c", "t", "s"]
+}
+
+def _expand_analysis(compact: Dict) -> Dict:
+    """Map the model's compact analysis answer to the analysis structure used everywhere else"""
+    if "analysis" in compact or "status" in compact:
+        # Already in the long form (or an error)
+        return compact
+    return {
+        "analysis": {
+            "required_capabilities": compact.get("c", []),
+            "suggested_tools": [
+                {"name": tool.get("n"), "purpose": tool.get("p", ""), "type": "custom"}
+                for tool in compact.get("t", [])
+            ],
+            "architecture_decisions": compact.get("d", [])
+        },
+        "generation_steps": [
+            {"step": number, "action": step.get("a"), "tool": step.get("u"), "details": step.get("x", "")}
+            for number, step in enumerate(compact.get("s", []), 1)
+        ],
+        "additional_considerations": compact.get("k", [])
+    }
+
+# How each backend takes a JSON schema to constrain decoding to
+_ANALYSIS_GRAMMARS = {
+    "hf_api": {"type": "json", "value": _ANALYSIS_SCHEMA},
+    "openai": {"type": "json_schema", "json_schema": {"name": "analysis", "schema": _ANALYSIS_SCHEMA}},
+    "vllm": _ANALYSIS_SCHEMA,
+}
+
+# Requirements mentioning none of these (and short enough to take at face
+# value) get the default plan below instead of an LLM analysis round-trip
+_AI_KEYWORDS_RE = re.compile(
+    r"\b(?:image|generat|llm|nlp|speech|vision|transcri|embed|chat|summari|classif|translat|model|learn|predict)",
+    re.IGNORECASE
+)
+_MAX_HEURISTIC_WORDS = 40
+
+def _default_analysis(requirements: str) -> Dict:
+    """Fixed-shape plan for requirements that need no AI/ML capabilities"""
+    return {
+        "analysis": {
+            "required_capabilities": [],
+            "suggested_tools": [],
+            "architecture_decisions": ["Single custom tool covering the requirements"]
+        },
+        "generation_steps": [
+            {
+                "step": 1,
+                "action": "Create agent directory structure",
+                "tool": "generate_agent_structure",
+                "details": "Set up the base directory structure for the agent"
+            },
+            {
+                "step": 2,
+                "action": "Generate the agent's tool",
+                "tool": "generate_tool",
+                "details": f"Create a custom tool that implements: {requirements.strip()}"
+            }
+        ],
+        "additional_considerations": []
+    }
+
+# Modules generated code may import inside the CodeAgent sandbox
+_AUTHORIZED_IMPORTS = ("os", "black", "smolagents", "subprocess", "sys", "pkg_resources", "json")
+
+@functools.lru_cache(maxsize=None)
+def _build_tools(space_tools: bool = True) -> tuple:
+    """Import (once) and return the tools available to the generation agent"""
+    from .tools.tool_generator import generate_tool
+    from .tools.agent_structure_generator import generate_agent_structure
+    from .tools.dependency_tools import install_dependencies, check_dependencies
+
+    tools = (
+        generate_tool,
+        generate_agent_structure,
+        install_dependencies,
+        check_dependencies,
+    )
+    if space_tools:
+        from .tools.space_tool_generator import generate_space_tool
+        from .tools.search_tools import (
+            search_huggingface_spaces, validate_space, search_and_validate_spaces, duckduckgo_search
+        )
+
+        tools += (
+            generate_space_tool,
+            search_huggingface_spaces,
+            validate_space,
+            search_and_validate_spaces,
+            duckduckgo_search,
+        )
+    return tools
+
+@functools.lru_cache(maxsize=None)
+def _build_planner_tools() -> tuple:
+    """Import (once) and return the research tools available to the planning agent"""
+    from .tools.search_tools import search_huggingface_spaces, validate_space, search_and_validate_spaces
+
+    return (search_huggingface_spaces, validate_space, search_and_validate_spaces)
+
+@functools.lru_cache(maxsize=None)
+def _get_model(model_id: str, hf_token: Optional[str] = None, backend: str = "hf_api", quantization: Optional[str] = None):
+    """
+    Build (once per configuration) the model behind the generation agents
+    
+    backend="hf_api" uses the Hugging Face Inference API. backend="vllm" loads the
+    model locally with vLLM, optionally quantized (e.g. "fp8", "awq-int4"), with prefix
+    caching enabled so the shared prompt preamble is reused across runs. If
+    AGENT_DRAFT_MODEL names a small draft model, vLLM decodes speculatively
+    with it, which pays off on the long low-entropy runs of JSON output.
+    backend="openai" talks to an OpenAI-compatible server such as vLLM
+    (AGENT_API_BASE, default DEFAULT_API_BASE; key from AGENT_API_KEY), which
+    batches the requests of concurrent generations on the server; start it
+    with --enable-prefix-caching (and --speculative-model for a draft model).
+    
+    HfApiModel's client sends requests through huggingface_hub's pooled
+    requests.Session, so reusing the model also reuses its keep-alive
+    connections across agent steps and generations.
+    """
+    if backend == "vllm":
+        from smolagents import VLLMModel
+
+        model_kwargs = {"dtype": "float16", "enable_prefix_caching": True}
+        if quantization:
+            model_kwargs["quantization"] = quantization.split("-")[0]
+        draft_model_id = os.getenv("AGENT_DRAFT_MODEL")
+        if draft_model_id:
+            model_kwargs["speculative_model"] = draft_model_id
+            model_kwargs["num_speculative_tokens"] = 5
+        return VLLMModel(model_id=model_id, model_kwargs=model_kwargs)
+    if backend == "openai":
+        from smolagents import OpenAIServerModel
+
+        return OpenAIServerModel(
+            model_id=model_id,
+            api_base=os.getenv("AGENT_API_BASE", DEFAULT_API_BASE),
+            api_key=os.getenv("AGENT_API_KEY", "EMPTY")
+        )
+    if backend != "hf_api":
+        raise ValueError(f"Unknown model backend: {backend}")
+
+    from smolagents import HfApiModel
+    return HfApiModel(model_id=model_id, token=hf_token)
+
+def _build_agent(
+    model_id: str,
+    hf_token: Optional[str] = None,
+    max_steps: int = 10,
+    planner: bool = False,
+    backend: str = "hf_api",
+    quantization: Optional[str] = None,
+    space_tools: bool = True
+) -> "CodeAgent":
+    """Build the CodeAgent that drives agent generation (or planning, if planner is set)"""
+    from smolagents import CodeAgent
+
+    return CodeAgent(
+        tools=list(_build_planner_tools() if planner else _build_tools(space_tools)),
+        model=_get_model(model_id, hf_token, backend, quantization),
+        max_steps=max_steps,
+        additional_authorized_imports=list(_AUTHORIZED_IMPORTS)
+    )
+
+# Shared agents, built once per configuration
+_get_agent = functools.lru_cache(maxsize=None)(_build_agent)
+
+@functools.lru_cache(maxsize=None)
+def get_generator(model_id: str = DEFAULT_MODEL_ID, hf_token: Optional[str] = None, max_steps: int = 10) -> "AgentGenerator":
+    """Return the process-wide AgentGenerator for this configuration"""
+    return AgentGenerator(model_id=model_id, hf_token=hf_token, max_steps=max_steps)
+
+class AgentGenerator:
+    # Per-agent part of the generation prompt, compiled once and shared by all instances
+    _AGENT_PROMPT_TEMPLATE = string.Template("""
+        Requirements:
+        $requirements
+
+        Generated Analysis:
+        $analysis
+
+        Steps to Execute:
+        $generation_steps
+
+        Additional Considerations:
+        $additional_considerations
+
+        Output Directory: $output_dir
+        """)
+    _CACHED_PLAN_TEMPLATE = string.Template("""
+        Cached Plan (tools and Hugging Face Spaces found for similar requirements; reuse them instead of searching again):
+        $cached_plan
+        """)
+    # Static instructions of the batched generation prompt, after the preamble
+    _BATCH_INSTRUCTIONS = """
+        Generate each of the agents below. Return a JSON list containing one
+        response object per agent, in the order the agents are given.
         """
 
+    def __init__(
+        self,
+        model_id=DEFAULT_MODEL_ID,
+        hf_token=None,
+        max_steps=10,
+        semantic_cache=False,
+        threshold=0.95,
+        plan_cache=False,
+        planner_model_id=None,
+        backend=None,
+        quantization=None,
+        local=False,
+        response_cache=False,
+        enable_space_tools=True,
+        semantic_analysis_cache=False,
+        fuse_analysis=False,
+        constrained_analysis=False,
+        background_install=False
+    ):
+        # Only store configuration here; the CodeAgents are built lazily and
+        # shared between every generator with the same configuration.
+        # model_id drives code generation, planner_model_id the requirement analysis.
+        self.model_id = model_id
+        self.hf_token = hf_token
+        self.max_steps = max_steps
+        # local=True is shorthand for running the models with vLLM on this machine;
+        # otherwise the AGENT_BACKEND environment variable picks the default
+        self.backend = "vllm" if local else backend or os.getenv("AGENT_BACKEND", "hf_api")
+        # Each local vLLM engine reserves most of the GPU memory, so unless a
+        # planner is named explicitly it shares the generation model's engine
+        if planner_model_id is None:
+            planner_model_id = model_id if self.backend == "vllm" else DEFAULT_PLANNER_MODEL_ID
+        self.planner_model_id = planner_model_id
+        # e.g. "fp8" or "awq-int4" for the vLLM backend; AGENT_QUANT sets the default
+        self.quantization = quantization or os.getenv("AGENT_QUANT")
+        # Whether the generation agent can search and wrap Hugging Face Spaces
+        self.enable_space_tools = enable_space_tools
+        self._semantic_cache = SemanticCache(threshold=threshold) if semantic_cache else None
+        self._plan_cache = PlanCache() if plan_cache else None
+        # Pass True for the default local SQLite cache, or a configured ResponseCache
+        if response_cache is True:
+            response_cache = ResponseCache()
+        self._response_cache = response_cache or None
+        # Three-tier cache for analyses of paraphrased requirements: hit at
+        # >= 0.93 similarity, LLM intent check between 0.75 and 0.93, miss below
+        self._analysis_cache = SemanticCache(
+            threshold=0.93, threshold_skip=0.75, namespace="analyses"
+        ) if semantic_analysis_cache else None
+        # Let the generation run analyze the requirements itself instead of a
+        # separate planner run: one LLM session per agent instead of two
+        self.fuse_analysis = fuse_analysis
+        # Analyze with one schema-constrained model call instead of a planner
+        # agent run: always valid JSON, but no Space research while planning
+        self.constrained_analysis = constrained_analysis
+        # pip-install the analyzed capabilities while the generation LLM runs
+        # instead of after it succeeds; failed runs wait for the install
+        self.background_install = background_install
+        # Created up front (its thread starts on first use) so concurrent
+        # runs share its single worker
+        self._install_executor = ThreadPoolExecutor(max_workers=1)
+
+    @property
+    def agent(self) -> "CodeAgent":
+        return self._agent_for(_get_agent, self.model_id, self.max_steps)
+
+    @property
+    def planner(self) -> "CodeAgent":
+        return self._agent_for(_get_agent, self.planner_model_id, self.max_steps, planner=True)
+
+    def _agent_for(self, agent_factory, model_id: str, max_steps: int, planner: bool = False) -> "CodeAgent":
+        """Get an agent for model_id from agent_factory using this generator's model settings"""
+        return agent_factory(
+            model_id, self.hf_token, max_steps, planner,
+            self.backend, self.quantization, self.enable_space_tools
+        )
+
+    @property
+    def model(self):
+        return self.agent.model
+
+    @llm_cached(
+        ttl="7d", tag="analyze-v4", model_attr="planner_model_id",
+        key_attrs=("backend", "quantization", "constrained_analysis", "fuse_analysis")
+    )
+    def _analyze_requirements(self, requirements: str, agent: Optional["CodeAgent"] = None) -> Dict:
+        """Get LLM suggestions for agent generation steps"""
+        if not self._needs_llm_analysis(requirements):
+            return _default_analysis(requirements)
+
+        analysis_prompt = _ANALYSIS_PROMPT_PREFIX + "\n\nREQUIREMENTS:\n" + requirements
+
         try:
-            result = self.agent.run(analysis_prompt)
+            if self.constrained_analysis:
+                model = _get_model(self.planner_model_id, self.hf_token, self.backend, self.quantization)
+                return _expand_analysis(loads(model(
+                    [{"role": "user", "content": analysis_prompt}],
+                    grammar=_ANALYSIS_GRAMMARS[self.backend]
+                ).content))
+            result = (agent or self.planner).run(analysis_prompt)
             # Ensure we return a dictionary, not a string
             if isinstance(result, str):
-                return json.loads(result)
-            return result
+                result = loads(result)
+            return _expand_analysis(result)
         except Exception as e:
             return {
                 "status": "error",
                 "error": f"Failed to analyze requirements: {str(e)}"
             }
 
+    @staticmethod
+    def _needs_llm_analysis(requirements: str) -> bool:
+        """Whether requirements are involved enough to warrant an LLM analysis"""
+        return (
+            _AI_KEYWORDS_RE.search(requirements) is not None
+            or len(requirements.split()) > _MAX_HEURISTIC_WORDS
+        )
+
+    def _same_intent(self, requirements: str, cached_requirements: str) -> bool:
+        """Ask the planner model whether two requirement texts describe the same agent"""
+        model = _get_model(self.planner_model_id, self.hf_token, self.backend, self.quantization)
+        prompt = (
+            "Do these two descriptions ask for the same AI agent? Answer only YES or NO.\n\n"
+            f"A:\n{requirements}\n\nB:\n{cached_requirements}"
+        )
+        try:
+            answer = model([{"role": "user", "content": prompt}]).content
+        except Exception:
+            return False
+        return answer.strip().upper().startswith("YES")
+
     def generate_agent(self, requirements: str, output_dir: str, custom_max_steps: Optional[int] = None):
         """
         Generates a new CodeAgent based on requirements
@@ -113,169 +478,534 @@ class AgentGenerator:
             output_dir: Directory to save generated agent
             custom_max_steps: Optional override for max steps for this specific generation
         """
+        return self._generate_agent(requirements, output_dir, custom_max_steps, _get_agent)
+
+    def generate_agent_stream(self, requirements: str, output_dir: str, custom_max_steps: Optional[int] = None) -> Iterator[str]:
+        """
+        Streaming variant of generate_agent
+        
+        Yields progress lines while the agent is being generated (tool files are
+        written as the corresponding steps complete). The last chunk is the
+        JSON result that generate_agent would return.
+        """
+        return self._iter_generate_agent(requirements, output_dir, custom_max_steps, _get_agent)
+
+    async def agenerate_agent(self, requirements: str, output_dir: str, custom_max_steps: Optional[int] = None):
+        """
+        Async variant of generate_agent
+
+        The generation runs in a worker thread with its own CodeAgent, so several
+        calls can be awaited concurrently (e.g. with asyncio.gather).
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(self._generate_agent, requirements, output_dir, custom_max_steps, _build_agent)
+        )
+
+    async def agenerate_many(self, jobs: List[Dict], custom_max_steps: Optional[int] = None, max_concurrency: Optional[int] = None) -> List[str]:
+        """
+        Generates several agents concurrently
+        
+        Args:
+            jobs: List of {"requirements": ..., "output_dir": ...} dicts
+            custom_max_steps: Optional override for max steps of each generation
+            max_concurrency: Optional limit on generations running at the same time
+        
+        Returns:
+            List of JSON result strings, one per job, in the same order
+        """
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+        async def run(job):
+            if semaphore is None:
+                return await self.agenerate_agent(job['requirements'], job['output_dir'], custom_max_steps)
+            async with semaphore:
+                return await self.agenerate_agent(job['requirements'], job['output_dir'], custom_max_steps)
+
+        return list(await asyncio.gather(*(run(job) for job in jobs)))
+
+    def _generate_agent(self, requirements: str, output_dir: str, custom_max_steps: Optional[int], agent_factory) -> str:
+        """Run the generation pipeline with agents obtained from agent_factory"""
+        result = None
+        for result in self._iter_generate_agent(requirements, output_dir, custom_max_steps, agent_factory):
+            pass
+        return result
+
+    def _iter_generate_agent(self, requirements: str, output_dir: str, custom_max_steps: Optional[int], agent_factory) -> Iterator[str]:
+        """Run the generation pipeline, yielding progress lines and finally the JSON result"""
+        install = None
         try:
-            # First, analyze requirements
-            analysis = self._analyze_requirements(requirements)
-            if isinstance(analysis, str):
-                analysis = json.loads(analysis)
-            
-            if analysis.get("status") == "error":
-                return json.dumps(analysis)
-
-            # Extract agent name and base path
-            agent_name = os.path.basename(output_dir)
-            base_path = os.path.dirname(output_dir)
-
-            # Create the complete structure first
-            structure_result = generate_agent_structure.forward(
-                agent_name=agent_name,
-                output_path=base_path,
-                tools_config=json.dumps(analysis.get('suggested_tools', [])),
-                agent_config=json.dumps({
-                    'model_id': self.model.model_id,
-                    'system_prompt': analysis.get('analysis', {}).get('system_prompt', ''),
-                    'imports': analysis.get('analysis', {}).get('required_imports', [])
-                }),
-                requirements=','.join(analysis.get('analysis', {}).get('required_capabilities', []))
-            )
-            
-            structure_data = json.loads(structure_result)
-            if structure_data.get('status') != 'success':
-                return structure_result
+            # Reuse a previously generated agent for (near-)identical requirements
+            if self._semantic_cache is not None:
+                cached = self._semantic_cache.lookup(requirements)
+                if cached is not None:
+                    yield self._semantic_cache.restore(cached, output_dir)
+                    return
+
+            # For familiar requirement shapes, search Spaces from the cached plan
+            # while the LLM is still analyzing the requirements
+            plan_key = prefetch = None
+            if self._plan_cache is not None:
+                plan_key = self._plan_cache.classify(requirements)
+                plan = self._plan_cache.get(plan_key) if plan_key else None
+                if plan is not None:
+                    prefetch = self._plan_cache.prefetch(plan)
 
-            agent_dir = structure_data['agent_path']
+            planner = None
+            if not self.fuse_analysis:
+                planner = self._agent_for(agent_factory, self.planner_model_id, self.max_steps, planner=True)
+                yield "Analyzing requirements\n"
+            prepared = self._prepare_agent(requirements, output_dir, planner)
+            if isinstance(prepared, str):
+                yield prepared
+                return
+            analysis, structure_data = prepared
+            yield f"Created agent structure at {structure_data['agent_path']}\n"
+
+            # pip-install the analyzed capabilities while the LLM generates
+            if self.background_install:
+                install = self._start_install(analysis)
 
             # Generate tools in the created structure
-            generation_prompt = self._build_prompt(requirements, agent_dir, analysis)
+            generation_prompt = self._build_prompt(
+                requirements,
+                structure_data['agent_path'],
+                self._analysis_fragments(analysis),
+                prefetch.result() if prefetch is not None else None
+            )
             
             # Run tool generation
-            if custom_max_steps is not None:
-                temp_agent = CodeAgent(
-                    tools=self.agent.tools,
-                    model=self.model,
-                    max_steps=custom_max_steps,
-                    additional_authorized_imports=self.agent._additional_authorized_imports
-                )
-                result = temp_agent.run(generation_prompt)
+            agent = self._agent_for(agent_factory, self.model_id, custom_max_steps or self.max_steps)
+            result = yield from self._stream_run(agent, generation_prompt)
+            if isinstance(result, str):
+                # Parsing also validates the answer: free text or truncated JSON
+                # is reported as an error result below instead of a success
+                result_data = loads(result)
+                if result_data.get('status') != 'success':
+                    yield result
+                    return
             else:
-                result = self.agent.run(generation_prompt)
-
-            # Process generation results
-            result_data = json.loads(result)
-            if result_data.get('status') == 'success':
-                # Collect and update generated tools
-                generated_tools = self._collect_generated_tools(agent_dir)
-                self._update_agent_imports(agent_dir, generated_tools)
-
-                # Install required dependencies
-                if analysis.get('analysis', {}).get('required_capabilities'):
-                    install_dependencies.forward(
-                        requirements=','.join(analysis['analysis']['required_capabilities'])
-                    )
-
-                return json.dumps({
-                    'status': 'success',
-                    'message': 'Agent generated successfully with complete structure',
-                    'agent_dir': agent_dir,
-                    'generated_tools': generated_tools,
-                    'analysis': analysis,
-                    'structure': structure_data
-                })
-
-            return result
+                result_data = result
+            analysis = self._merge_fused_analysis(analysis, result_data)
+
+            if plan_key is not None and result_data.get('status') == 'success':
+                details = analysis.get('analysis', {})
+                self._plan_cache.put(
+                    plan_key,
+                    tool_names=[t['name'] for t in details.get('suggested_tools', []) if 'name' in t],
+                    space_queries=details.get('required_capabilities', [])
+                )
+
+            yield self._finalize_agent(requirements, analysis, structure_data, result_data, install)
 
         except Exception as e:
-            return json.dumps({
+            yield dumps({
                 'status': 'error',
                 'error': str(e)
             })
+        finally:
+            if install is not None:
+                self._abandon_install(install)
 
-    def _build_prompt(self, requirements: str, output_dir: str, analysis: Dict) -> str:
-        """Build generation prompt using LLM's analysis"""
-        return f"""
-        Follow these steps to generate a new AI agent:
+    def _stream_run(self, agent: "CodeAgent", prompt: str):
+        """Run agent in streaming mode, yielding a line per completed step; returns the final answer"""
+        final = None
+        for final in agent.run(prompt, stream=True):
+            step_number = getattr(final, 'step_number', None)
+            if step_number is not None:
+                yield f"Completed generation step {step_number}\n"
+        # Recent smolagents versions wrap the answer in a FinalAnswerStep
+        return getattr(final, 'output', getattr(final, 'final_answer', final))
 
-        Requirements:
-        {requirements}
+    def generate_agents(self, jobs: List[Dict], custom_max_steps: Optional[int] = None) -> List[str]:
+        """
+        Generates several agents with a single generation run
+        
+        Each agent is analyzed and scaffolded individually, then one prompt asks
+        the model to generate all of them so the shared instructions are only
+        processed once.
+        
+        Args:
+            jobs: List of {"requirements": ..., "output_dir": ...} dicts
+            custom_max_steps: Optional override for max steps of the generation run
+        
+        Returns:
+            List of JSON result strings, one per job, in the same order
+        """
+        responses = [None] * len(jobs)
+        pending = []
 
-        Generated Analysis:
-        {json.dumps(analysis.get('analysis', {}), indent=2)}
+        for index, job in enumerate(jobs):
+            try:
+                if self._semantic_cache is not None:
+                    cached = self._semantic_cache.lookup(job['requirements'])
+                    if cached is not None:
+                        responses[index] = self._semantic_cache.restore(cached, job['output_dir'])
+                        continue
 
-        Steps to Execute:
-        {json.dumps(analysis.get('generation_steps', []), indent=2)}
+                prepared = self._prepare_agent(
+                    job['requirements'], job['output_dir'], None if self.fuse_analysis else self.planner
+                )
+                if isinstance(prepared, str):
+                    responses[index] = prepared
+                else:
+                    pending.append((index, job['requirements'], *prepared))
+            except Exception as e:
+                responses[index] = dumps({'status': 'error', 'error': str(e)})
 
-        Additional Considerations:
-        {json.dumps(analysis.get('additional_considerations', []), indent=2)}
+        if not pending:
+            return responses
 
-        Output Directory: {output_dir}
+        try:
+            generation_prompt = self._build_batch_prompt([
+                (requirements, structure_data['agent_path'], self._analysis_fragments(analysis))
+                for _, requirements, analysis, structure_data in pending
+            ])
+            agent = self._agent_for(_get_agent, self.model_id, custom_max_steps or self.max_steps)
+            results = agent.run(generation_prompt)
+            if isinstance(results, (str, bytes)):
+                results = loads(results)
+            if not isinstance(results, list) or len(results) != len(pending):
+                raise ValueError(f"Expected a list of {len(pending)} agent results")
+        except Exception as e:
+            error = dumps({'status': 'error', 'error': str(e)})
+            for index, *_ in pending:
+                responses[index] = error
+            return responses
 
-        Use these tools as needed:
-        - generate_tool: Create custom tools
-        - generate_agent_structure: Create agent directory structure
-        - install_dependencies: Handle package dependencies
-        - check_dependencies: Verify package installations
+        for (index, requirements, analysis, structure_data), result_data in zip(pending, results):
+            try:
+                analysis = self._merge_fused_analysis(analysis, result_data)
+                responses[index] = self._finalize_agent(requirements, analysis, structure_data, result_data)
+            except Exception as e:
+                responses[index] = dumps({'status': 'error', 'error': str(e)})
+        return responses
 
-        Execute each step in the generation_steps sequence, ensuring to:
-        1. Follow the exact order of steps
-        2. Use the specified tool for each step
-        3. Follow the detailed instructions for each step
-        4. Handle any errors appropriately
-        5. Report progress after each step
+    def _prepare_agent(self, requirements: str, output_dir: str, planner: Optional["CodeAgent"]):
+        """
+        Analyze requirements and create the agent directory structure
+        
+        With fuse_analysis the analysis is left to the generation run and the
+        structure is created from an empty one.
+        
+        Returns:
+            (analysis, structure_data) on success, otherwise a JSON error string
+        """
+        from .tools.agent_structure_generator import generate_agent_structure
 
-        Return a JSON response with:
-        {{
-            "status": "success/error",
-            "message": "Status message",
-            "agent_dir": "Path to generated agent",
-            "steps_completed": ["List of completed steps"],
-            "generated_tools": ["List of generated tools"],
-            "errors": ["Any errors encountered"]
-        }}
+        # First, analyze requirements (or reuse an earlier analysis of the
+        # exact same text, then of a paraphrase, cheapest lookup first)
+        if self.fuse_analysis:
+            analysis = {"analysis": {}}
+        else:
+            analysis = AgentGenerator._analyze_requirements.cached(self, requirements)
+        if analysis is None and self._analysis_cache is not None:
+            cached = self._analysis_cache.lookup(
+                requirements,
+                verify=lambda cached_requirements: self._same_intent(requirements, cached_requirements)
+            )
+            if cached is not None:
+                analysis = cached["analysis"]
+        if analysis is None:
+            analysis = self._analyze_requirements(requirements, planner)
+            if isinstance(analysis, str):
+                analysis = loads(analysis)
+            
+            if analysis.get("status") == "error":
+                return dumps(analysis)
+            if self._analysis_cache is not None:
+                self._analysis_cache.add(requirements, analysis=analysis)
+
+        # Extract agent name and base path
+        agent_name = os.path.basename(output_dir)
+        base_path = os.path.dirname(output_dir)
+
+        # Create the complete structure first
+        details = analysis.get('analysis', {})
+        structure_result = generate_agent_structure.forward(
+            agent_name=agent_name,
+            output_path=base_path,
+            tools_config=dumps(analysis.get('suggested_tools', [])),
+            agent_config=dumps({
+                'model_id': self.model_id,
+                'system_prompt': details.get('system_prompt', ''),
+                'imports': details.get('required_imports', [])
+            }),
+            requirements=','.join(details.get('required_capabilities', [])),
+            include_agent_source=True
+        )
+        
+        structure_data = loads(structure_result)
+        if structure_data.get('status') != 'success':
+            return structure_result
+
+        # Keep the agent.py source in memory so it needn't be read back when
+        # wiring in the tools, together with the mtime that proves it's current
+        agent_py_content = structure_data.pop('agent_py_content', None)
+        if agent_py_content is not None:
+            agent_file = os.path.join(structure_data['agent_path'], "src", "agent.py")
+            structure_data['_agent_py'] = (agent_py_content, os.stat(agent_file).st_mtime_ns)
+
+        return analysis, structure_data
+
+    def _start_install(self, analysis: Dict) -> Optional[Future]:
+        """Install the analysis' required capabilities in a background thread"""
+        capabilities = analysis.get('analysis', {}).get('required_capabilities')
+        if not capabilities:
+            return None
+
+        from .tools.dependency_tools import install_dependencies
+
+        return self._install_executor.submit(install_dependencies.forward, requirements=','.join(capabilities))
+
+    @staticmethod
+    def _abandon_install(install: Future):
+        """Cancel a background install that has not started, otherwise wait for it
+
+        Waiting keeps a failed run from returning (and the process from
+        exiting on the install's worker thread) while pip is still running.
         """
+        if not install.cancel():
+            try:
+                install.result()
+            except Exception:
+                pass
 
-    def _collect_generated_tools(self, agent_dir: str) -> List[Dict]:
-        """Collect information about generated tools"""
-        tools = []
-        tools_dir = os.path.join(agent_dir, "src", "tools")
+    def _finalize_agent(
+        self,
+        requirements: str,
+        analysis: Dict,
+        structure_data: Dict,
+        result_data: Dict,
+        install: Optional[Future] = None
+    ) -> str:
+        """
+        Wire generated tools into the agent and build the final JSON response
         
-        if os.path.exists(tools_dir):
-            for file in os.listdir(tools_dir):
-                if file.endswith('.py') and file != '__init__.py':
-                    tool_name = file[:-3]
-                    tools.append({
-                        'name': tool_name,
-                        'import_path': f'.tools.{tool_name}'
-                    })
-        return tools
-
-    def _update_agent_imports(self, agent_dir: str, tools: List[Dict]):
-        """Update agent.py to include all generated tools"""
-        agent_file = os.path.join(agent_dir, "src", "agent.py")
+        install is the pending installation from _start_install, if one was
+        started; otherwise the dependencies are installed here.
+        """
+        if result_data.get('status') != 'success':
+            return dumps(result_data)
+
+        from .tools.dependency_tools import install_dependencies
+
+        agent_dir = structure_data['agent_path']
+        src_dir = os.path.join(agent_dir, "src")
+        tools_dir = os.path.join(src_dir, "tools")
+        agent_py_path = os.path.join(src_dir, "agent.py")
+
+        # Reuse the agent.py source from structure creation unless the
+        # generation run rewrote the file since
+        agent_py_content = None
+        agent_py = structure_data.pop('_agent_py', None)
+        if agent_py is not None:
+            try:
+                if os.stat(agent_py_path).st_mtime_ns == agent_py[1]:
+                    agent_py_content = agent_py[0]
+            except OSError:
+                pass
+
+        # Collect and update generated tools
+        generated_tools = self._collect_generated_tools(tools_dir)
+        self._update_agent_imports(agent_py_path, generated_tools, initial_content=agent_py_content)
+
+        # Install required dependencies (or wait for the background install)
+        if install is not None:
+            install.result()
+        else:
+            capabilities = analysis.get('analysis', {}).get('required_capabilities')
+            if capabilities:
+                install_dependencies.forward(requirements=','.join(capabilities))
+
+        response = dumps({
+            'status': 'success',
+            'message': 'Agent generated successfully with complete structure',
+            'agent_dir': agent_dir,
+            'generated_tools': generated_tools,
+            'analysis': analysis,
+            'structure': structure_data
+        })
+        if self._semantic_cache is not None:
+            self._semantic_cache.store(requirements, agent_dir, response)
+        return response
+
+    def _build_prompt(self, requirements: str, output_dir: str, fragments: Dict[str, str], cached_plan: Optional[Dict] = None) -> str:
+        """Build generation prompt from the pre-rendered analysis fragments"""
+        # The static preamble always comes first and is byte-identical across
+        # calls so provider-side prefix/KV caches can reuse it; only the tail varies.
+        prompt = self._preamble() + self._describe_agent(requirements, output_dir, fragments)
+        if cached_plan:
+            prompt += self._CACHED_PLAN_TEMPLATE.substitute(cached_plan=dumps(cached_plan, pretty=True))
+        return prompt
+
+    def _build_batch_prompt(self, agents: List[tuple]) -> str:
+        """Build a single generation prompt covering several (requirements, output_dir, fragments) agents"""
+        parts = [self._preamble(), self._BATCH_INSTRUCTIONS]
+        for number, (requirements, output_dir, fragments) in enumerate(agents, 1):
+            parts.append(f"""
+        Agent {number}:
+        """)
+            parts.append(self._describe_agent(requirements, output_dir, fragments))
+        return "".join(parts)
+
+    def _preamble(self) -> str:
+        """Static head of the generation prompt"""
+        return _FUSED_PROMPT_PREAMBLE if self.fuse_analysis else PROMPT_PREAMBLE
+
+    def _describe_agent(self, requirements: str, output_dir: str, fragments: Dict[str, str]) -> str:
+        """Render the per-agent part of a generation prompt"""
+        return self._AGENT_PROMPT_TEMPLATE.substitute(
+            requirements=requirements,
+            output_dir=output_dir,
+            **fragments
+        )
+
+    def _analysis_fragments(self, analysis: Dict) -> Dict[str, str]:
+        """Prompt fragments for analysis, or the step 0 instructions when analysis is fused"""
+        if self.fuse_analysis:
+            return _FUSED_ANALYSIS_FRAGMENTS
+        return self._render_analysis(analysis)
+
+    def _merge_fused_analysis(self, analysis: Dict, result_data: Dict) -> Dict:
+        """Take over the analysis a fused generation run reported in its result"""
+        if self.fuse_analysis and isinstance(result_data.get('analysis'), dict):
+            return {**analysis, 'analysis': result_data['analysis']}
+        return analysis
+
+    @staticmethod
+    def _render_analysis(analysis: Dict) -> Dict[str, str]:
+        """Serialize the prompt-facing parts of an analysis, once per agent"""
+        return {
+            'analysis': dumps(analysis.get('analysis', {}), pretty=True),
+            'generation_steps': dumps(analysis.get('generation_steps', []), pretty=True),
+            'additional_considerations': dumps(analysis.get('additional_considerations', []), pretty=True),
+        }
+
+    @staticmethod
+    def _collect_generated_tools(tools_dir: str) -> List[Dict]:
+        """Collect information about the tools generated in an agent's tools directory"""
+        try:
+            entries = os.scandir(tools_dir)
+        except FileNotFoundError:
+            return []
+
+        # DirEntry caches the file type, so no extra stat per entry
+        with entries:
+            return [
+                {
+                    'name': entry.name[:-3],
+                    'import_path': f'.tools.{entry.name[:-3]}'
+                }
+                for entry in entries
+                if entry.name[-3:] == '.py'
+                and entry.name != '__init__.py'
+                and entry.is_file(follow_symlinks=False)
+            ]
+
+    @staticmethod
+    def _update_agent_imports(agent_file: str, tools: List[Dict], initial_content: Optional[str] = None):
+        """
+        Update an agent.py file to include all generated tools
         
-        if os.path.exists(agent_file):
-            with open(agent_file, 'r') as f:
-                content = f.read()
-            
-            # Add tool imports if not already present
-            import_section = "from smolagents import CodeAgent, HfApiModel, DuckDuckGoSearchTool\n"
-            for tool in tools:
-                import_section += f"from {tool['import_path']} import {tool['name']}\n"
-            
-            # Update tools list in CodeAgent initialization
-            tools_list = "[\n                self.search_tool,  # Add search tool first\n"
-            for tool in tools:
-                tools_list += f"                {tool['name']},\n"
-            tools_list += "            ]"
+        If initial_content is given it is taken as the current agent.py
+        source and the file is not read back from disk.
+        """
+        # Nothing to wire in: skip the read and the parse entirely
+        if not tools:
+            return
+
+        if initial_content is not None or os.path.exists(agent_file):
+            if initial_content is not None:
+                content = initial_content
+            else:
+                with open(agent_file, 'r') as f:
+                    content = f.read()
             
-            # Update the content
-            content = content.replace(
-                "from smolagents import CodeAgent, HfApiModel, DuckDuckGoSearchTool",
-                import_section
-            )
-            content = content.replace(
-                "tools=[self.search_tool]",
-                f"tools={tools_list}"
+            patched = AgentGenerator._inject_tools(content, tools)
+            if patched != content:
+                # Swap the file in atomically so it is never left half-written
+                tmp_file = agent_file + ".tmp"
+                with open(tmp_file, 'w') as f:
+                    f.write(patched)
+                os.replace(tmp_file, agent_file)
+
+    @staticmethod
+    def _inject_tools(content: str, tools: List[Dict]) -> str:
+        """
+        Add tool imports and CodeAgent tools entries to agent.py source
+        
+        The source is parsed once and the edits are spliced in at the node
+        positions, so formatting and comments survive. Tools that are already
+        imported or listed are skipped, which makes re-running a no-op.
+        """
+        try:
+            tree = ast.parse(content)
+        except SyntaxError:
+            return content
+
+        imported = {
+            ((node.module or '').lstrip('.'), alias.name)
+            for node in ast.walk(tree) if isinstance(node, ast.ImportFrom)
+            for alias in node.names
+        }
+        smolagents_import = next(
+            (node for node in tree.body if isinstance(node, ast.ImportFrom) and node.module == 'smolagents'),
+            None
+        )
+        tools_list = next(
+            (
+                keyword.value
+                for node in ast.walk(tree)
+                if isinstance(node, ast.Call) and getattr(node.func, 'id', None) == 'CodeAgent'
+                for keyword in node.keywords
+                if keyword.arg == 'tools' and isinstance(keyword.value, ast.List)
+            ),
+            None
+        )
+
+        # ast columns are UTF-8 byte offsets, so splice on the encoded source
+        source = content.encode()
+        line_starts = [0]
+        for line in source.splitlines(keepends=True):
+            line_starts.append(line_starts[-1] + len(line))
+
+        edits = []
+        if smolagents_import is not None:
+            import_lines = "".join(
+                f"from {tool['import_path']} import {tool['name']}\n"
+                for tool in tools
+                if (tool['import_path'].lstrip('.'), tool['name']) not in imported
             )
-            
-            with open(agent_file, 'w') as f:
-                f.write(content)
\ No newline at end of file
+            if import_lines:
+                edits.append((line_starts[smolagents_import.end_lineno], import_lines))
+
+        if tools_list is not None:
+            listed = {elt.id for elt in tools_list.elts if isinstance(elt, ast.Name)}
+            names = [tool['name'] for tool in tools if tool['name'] not in listed]
+            if names:
+                close = line_starts[tools_list.end_lineno - 1] + tools_list.end_col_offset - 1
+                # Align with the elements of a multi-line list, otherwise
+                # indent one level past the line that opens the list
+                if tools_list.elts and tools_list.elts[0].lineno != tools_list.lineno:
+                    indent = " " * tools_list.elts[0].col_offset
+                else:
+                    opening = source[line_starts[tools_list.lineno - 1]:line_starts[tools_list.lineno]]
+                    indent = " " * (len(opening) - len(opening.lstrip()) + 4)
+                if tools_list.elts:
+                    last = tools_list.elts[-1]
+                    last_end = line_starts[last.end_lineno - 1] + last.end_col_offset
+                    if b"," not in source[last_end:close].split(b"#")[0]:
+                        edits.append((last_end, ","))
+                # Keep the closing bracket on its own line if it already is
+                line_start = source.rfind(b"\n", 0, close) + 1
+                if source[line_start:close].strip():
+                    edits.append((close, "".join(f"\n{indent}{name}," for name in names)))
+                else:
+                    edits.append((line_start, "".join(f"{indent}{name},\n" for name in names)))
+
+        # Splice from the end; edits at the same position land in the order they were made
+        for position, text in reversed(sorted(edits, key=lambda edit: edit[0])):
+            source = source[:position] + text.encode() + source[position:]
+        return source.decode()
\ No newline at end of file
@@ -1,5 +1,7 @@
 import argparse
+import asyncio
 import os
+import sys
 from .agent_generator import AgentGenerator
 
 def main():
@@ -7,14 +9,26 @@ def main():
     parser.add_argument(
         "--requirements", "-r",
         type=str,
+        nargs="+",
         required=True,
-        help="Path to requirements file or requirements string"
+        help="Paths to requirements files or requirements strings (one agent each)"
     )
     parser.add_argument(
         "--output-dir", "-o",
         type=str,
         default="generated_agents",
-        help="Output directory for generated agent"
+        help="Output directory for generated agent (parent directory when generating several)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of agents generated at the same time"
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Generate several agents with a single batched prompt instead of concurrent runs"
     )
     parser.add_argument(
         "--model-id",
@@ -22,31 +36,78 @@ def main():
         default="meta-llama/Llama-2-70b-chat-hf",
         help="Hugging Face model ID to use"
     )
+    parser.add_argument(
+        "--planner-model-id",
+        type=str,
+        default=None,
+        help=(
+            "Smaller Hugging Face model ID used to plan tools before code generation "
+            "(default: mistralai/Mistral-7B-Instruct-v0.3, or --model-id with the vLLM backend)"
+        )
+    )
     parser.add_argument(
         "--hf-token",
         type=str,
         default=os.getenv("HF_TOKEN"),
         help="Hugging Face API token"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the on-disk cache for Hugging Face Space searches"
+    )
     
     args = parser.parse_args()
+
+    if args.no_cache:
+        from .tools.search_tools import set_cache_enabled
+        set_cache_enabled(False)
     
-    # Read requirements from file if it exists
-    if os.path.exists(args.requirements):
-        with open(args.requirements, "r") as f:
-            requirements = f.read()
-    else:
-        requirements = args.requirements
+    # Read requirements from files where they exist
+    jobs = []
+    used_names = set()
+    for number, source in enumerate(args.requirements, 1):
+        # Open directly rather than stat first; anything that isn't a
+        # readable file is taken as the requirements text itself
+        try:
+            with open(source, "r") as f:
+                requirements = f.read()
+            name = os.path.splitext(os.path.basename(source))[0]
+        except (OSError, ValueError):
+            requirements = source
+            name = f"agent_{number}"
+        # Files with the same name in different directories (or repeated
+        # sources) must not be generated into the same directory at once
+        if name in used_names:
+            name = f"{name}_agent_{number}"
+        used_names.add(name)
+        jobs.append({"requirements": requirements, "output_dir": os.path.join(args.output_dir, name)})
     
     generator = AgentGenerator(
         model_id=args.model_id,
+        planner_model_id=args.planner_model_id,
         hf_token=args.hf_token
     )
+
+    if len(jobs) > 1:
+        if args.batch:
+            results = generator.generate_agents(jobs)
+        else:
+            results = asyncio.run(generator.agenerate_many(jobs, max_concurrency=args.concurrency))
+        for result in results:
+            print(result)
+        return
     
-    result = generator.generate_agent(
-        requirements=requirements,
+    # Progress lines go to stderr as they happen; the last chunk is the result
+    result = None
+    for chunk in generator.generate_agent_stream(
+        requirements=jobs[0]["requirements"],
         output_dir=args.output_dir
-    )
+    ):
+        if result is not None:
+            sys.stderr.write(result)
+            sys.stderr.flush()
+        result = chunk
     
     print(result)
 
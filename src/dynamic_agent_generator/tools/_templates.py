@@ -0,0 +1,271 @@
+import ast
+import functools
+import string
+from typing import Dict, List, Optional, Tuple
+
+from .._json import dumps
+
+# Skeleton of a generated tool module, compiled once
+_TOOL_TEMPLATE = string.Template('''
+from smolagents import Tool
+from typing import Optional
+import json
+
+class ${tool_name}Tool(Tool):
+    """$docstring"""
+    
+    name = "$tool_lower"
+    description = $description
+    inputs = {
+        "input": {
+            "type": "string",
+            "description": "Input description"
+        },
+        "optional_param": {
+            "type": "string",
+            "description": "Optional parameter",
+            "nullable": True
+        }
+    }
+    output_type = "string"
+
+    def forward(self, input: str, optional_param: Optional[str] = None) -> str:
+        """Tool implementation"""
+        results = {"result": "value"}
+        return json.dumps(results)
+
+# Create instance of the tool
+$tool_lower = ${tool_name}Tool()
+''')
+
+def render_tool(tool_name: str, description: str, tool_lower: Optional[str] = None) -> str:
+    """Render the source of a generated tool module"""
+    return _TOOL_TEMPLATE.substitute(
+        tool_name=tool_name,
+        tool_lower=tool_lower or tool_name.lower(),
+        # Escape backslashes and quotes so no description can end the docstring early
+        docstring=description.replace('\\', '\\\\').replace('"', '\\"'),
+        description=repr(description)
+    )
+
+_EXAMPLE_TEMPLATE = string.Template('''
+from ${agent_lower}_agent import create_agent
+
+def main():
+    # Initialize the agent
+    agent = create_agent(max_steps=30)
+    
+    # Example prompts
+    prompts = [
+        "Example task 1",
+        "Example task 2"
+    ]
+    
+    # Run examples
+    for prompt in prompts:
+        print(f"\\nPrompt: {prompt}")
+        result = agent.run(prompt)
+        print(f"Result: {result}")
+
+if __name__ == "__main__":
+    main()
+''')
+
+_README_HEAD_TEMPLATE = string.Template('''
+# $agent_name Agent
+
+Auto-generated CodeAgent with specific capabilities.
+
+## Directory Structure
+```
+$agent_name/
+├── src/
+│   ├── tools/
+│   ├── agent.py
+│   └── __init__.py
+├── tests/
+├── examples/
+├── docs/
+└── README.md
+```
+
+## Installation
+```bash
+pip install -r requirements.txt
+```
+
+## Usage
+```python
+from ${agent_lower}_agent import create_agent
+
+# Initialize with custom settings
+agent = create_agent(
+    hf_token="your_token_here",
+    max_steps=30
+)
+
+# Run the agent
+response = agent.run("your prompt here")
+```
+
+## Available Tools
+''')
+
+# Static file contents, encoded once at import
+README_TAIL = '''
+## Documentation
+See the `docs/` directory for detailed documentation.
+'''.encode()
+
+BASE_REQUIREMENTS = b"smolagents>=1.2.2\nhuggingface-hub>=0.19.0"
+
+# Batch runs reuse the same few agent names, so keep the encoded results
+@functools.lru_cache(maxsize=128)
+def render_example(agent_lower: str) -> bytes:
+    """Render examples/basic_usage.py for an agent as UTF-8"""
+    return _EXAMPLE_TEMPLATE.substitute(agent_lower=agent_lower).encode()
+
+@functools.lru_cache(maxsize=128)
+def render_readme_head(agent_name: str) -> bytes:
+    """Render the README up to the tool list as UTF-8"""
+    return _README_HEAD_TEMPLATE.substitute(agent_name=agent_name, agent_lower=agent_name.lower()).encode()
+
+@functools.lru_cache(maxsize=128)
+def render_package_init(agent_name: str) -> bytes:
+    """Render the agent package's src/__init__.py as UTF-8"""
+    return f"from .agent import {agent_name}Agent".encode()
+
+@functools.lru_cache(maxsize=128)
+def render_tools_init_header(agent_name: str) -> bytes:
+    """Render the first line of the tools package __init__.py as UTF-8"""
+    return f"# Tools for {agent_name}\n".encode()
+
+# Source of a generated agent.py. The __NAME__ placeholders are plain
+# identifiers, so the template is itself valid Python and is parsed once
+_AGENT_TEMPLATE_SRC = '''
+from smolagents import CodeAgent, HfApiModel, DuckDuckGoSearchTool
+from .tools import *
+from typing import Optional
+import os
+
+# orjson is an optional speedup; fall back to the standard library without it
+from json import dumps as _json_dumps
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            # e.g. non-string dict keys or ints wider than 64 bits
+            return _json_dumps(obj)
+except ImportError:
+    _dumps = _json_dumps
+
+class __AGENT_CLASS__:
+    """__DOCSTRING__"""
+    
+    def __init__(self, hf_token: Optional[str] = None, max_steps: int = 20):
+        self.model = HfApiModel(
+            model_id=__MODEL_ID__,
+            token=hf_token or os.getenv("HF_TOKEN")
+        )
+        
+        # Initialize DuckDuckGoSearchTool
+        self.search_tool = DuckDuckGoSearchTool()
+        
+        self.agent = CodeAgent(
+            tools=[
+                self.search_tool,  # Add search tool first
+                __TOOLS__
+            ],
+            model=self.model,
+            max_steps=max_steps,
+            system_prompt=__SYSTEM_PROMPT__,
+            additional_authorized_imports=[
+                "os", "json", "typing", "smolagents", "requests"
+            ] + __IMPORTS__
+        )
+    
+    def run(self, prompt: str, custom_max_steps: Optional[int] = None) -> str:
+        """Run the agent with the given prompt"""
+        try:
+            if custom_max_steps is not None:
+                # max_steps is read on each run, so override it in place
+                # instead of building a second CodeAgent
+                original_max_steps = self.agent.max_steps
+                self.agent.max_steps = custom_max_steps
+                try:
+                    result = self.agent.run(prompt)
+                finally:
+                    self.agent.max_steps = original_max_steps
+            else:
+                result = self.agent.run(prompt)
+            return _dumps({"status": "success", "result": result})
+        except Exception as e:
+            return _dumps({"status": "error", "error": str(e)})
+'''
+
+def _split_agent_template(src: str) -> Tuple[List[str], List[str]]:
+    """
+    Split the agent template at its placeholders, located through the AST
+
+    Returns the literal chunks and the placeholder keys between them, so
+    rendering is a single join with no per-call parsing or formatting.
+    """
+    # ast columns are UTF-8 byte offsets; the template is ASCII, so they
+    # are also str offsets
+    line_starts = [0]
+    for line in src.splitlines(keepends=True):
+        line_starts.append(line_starts[-1] + len(line))
+
+    spans = []
+    for node in ast.walk(ast.parse(src)):
+        if isinstance(node, ast.Name) and node.id.startswith("__") and node.id.endswith("__"):
+            start = line_starts[node.lineno - 1] + node.col_offset
+            spans.append((start, start + len(node.id), node.id))
+        elif isinstance(node, ast.ClassDef) and node.name == "__AGENT_CLASS__":
+            start = src.index(node.name, line_starts[node.lineno - 1] + node.col_offset)
+            spans.append((start, start + len(node.name), node.name))
+            doc = node.body[0].value
+            start = line_starts[doc.lineno - 1] + doc.col_offset
+            spans.append((start, line_starts[doc.end_lineno - 1] + doc.end_col_offset, "__DOCSTRING__"))
+    spans.sort()
+
+    chunks, keys, pos = [], [], 0
+    for start, end, key in spans:
+        chunks.append(src[pos:start])
+        keys.append(key)
+        pos = end
+    chunks.append(src[pos:])
+    return chunks, keys
+
+_AGENT_CHUNKS, _AGENT_KEYS = _split_agent_template(_AGENT_TEMPLATE_SRC)
+
+def render_agent(
+    agent_name: str,
+    model_id: str,
+    system_prompt: str,
+    tools: List[str],
+    imports: List[str]
+) -> str:
+    """
+    Render the source of a generated agent.py
+
+    String values are emitted as Python literals, so quotes or backslashes
+    in the config cannot break the generated module.
+    """
+    values: Dict[str, str] = {
+        "__AGENT_CLASS__": f"{agent_name}Agent",
+        "__DOCSTRING__": f'"""Generated agent for {agent_name}"""',
+        "__MODEL_ID__": repr(model_id),
+        "__TOOLS__": ", ".join(tools),
+        "__SYSTEM_PROMPT__": repr(system_prompt),
+        # A JSON array of strings is also a valid Python list literal
+        "__IMPORTS__": dumps(list(imports)),
+    }
+    parts = [_AGENT_CHUNKS[0]]
+    for key, chunk in zip(_AGENT_KEYS, _AGENT_CHUNKS[1:]):
+        parts.append(values[key])
+        parts.append(chunk)
+    return "".join(parts)
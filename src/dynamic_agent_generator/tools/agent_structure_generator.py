@@ -1,8 +1,34 @@
 from smolagents import Tool
 import os
-import shutil
-from typing import Dict, Optional, List
-import json
+from typing import Dict, Optional, List, Union
+from concurrent.futures import ThreadPoolExecutor
+import functools
+from .._json import dumps, loads
+from ._templates import (
+    BASE_REQUIREMENTS, README_TAIL, render_agent, render_example,
+    render_package_init, render_readme_head, render_tool, render_tools_init_header
+)
+
+@functools.lru_cache(maxsize=128)
+def _loads_cached(s: str):
+    """Parse a JSON config string, reusing the result for repeated strings
+
+    The parsed value is shared between callers and must not be mutated.
+    """
+    return loads(s)
+
+def _write_all(path: str, data: Union[str, bytes]) -> None:
+    """Write data (str is UTF-8 encoded) with a raw fd, skipping the buffered IO stack"""
+    buf = memoryview(data.encode("utf-8") if isinstance(data, str) else data)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while buf:
+            buf = buf[os.write(fd, buf):]
+    finally:
+        os.close(fd)
+
+# Fixed head of the success result, up to the path inside its message
+_SUCCESS_PREFIX = '{"status":"success","message":"Agent structure created at '
 
 class AgentStructureGenerator(Tool):
     """Tool for generating complete agent directory structure"""
@@ -30,6 +56,11 @@ class AgentStructureGenerator(Tool):
             "type": "string",
             "description": "Comma-separated list of Python package requirements",
             "nullable": True
+        },
+        "include_agent_source": {
+            "type": "boolean",
+            "description": "Also return the generated agent.py source as agent_py_content",
+            "nullable": True
         }
     }
     output_type = "string"
@@ -45,178 +76,75 @@ class AgentStructureGenerator(Tool):
             'docs': os.path.join(base_path, 'docs')
         }
         
-        for path in directories.values():
-            os.makedirs(path, exist_ok=True)
+        # Only the root may need missing ancestors; the rest are listed
+        # parents first, so one mkdir each is enough (no ancestor re-walks)
+        os.makedirs(base_path, exist_ok=True)
+        for path in list(directories.values())[1:]:
+            try:
+                os.mkdir(path)
+            except FileExistsError:
+                pass
             
         return directories
 
-    def _generate_tool_template(self, tool_name: str, description: str) -> str:
-        """Generate a tool class template"""
-        return f'''
-from smolagents import Tool
-from typing import Optional
-import json
-
-class {tool_name}Tool(Tool):
-    """{{description}}"""
-    
-    name = "{tool_name.lower()}"
-    description = "{{description}}"
-    inputs = {{
-        "input": {{
-            "type": "string",
-            "description": "Input description"
-        }},
-        "optional_param": {{
-            "type": "string",
-            "description": "Optional parameter",
-            "nullable": True
-        }}
-    }}
-    output_type = "string"
-
-    def forward(self, input: str, optional_param: Optional[str] = None) -> str:
-        """Tool implementation"""
-        results = {{"result": "value"}}
-        return json.dumps(results)
-
-# Create instance of the tool
-{tool_name.lower()} = {tool_name}Tool()
-'''
-
-    def _create_agent_file(self, agent_name: str, config: Dict, tools: List[Dict], path: str):
-        """Creates the main agent file"""
-        agent_content = f'''
-from smolagents import CodeAgent, HfApiModel, DuckDuckGoSearchTool
-from .tools import *
-from typing import Optional
-import os
-import json
-
-class {agent_name}Agent:
-    """Generated agent for {agent_name}"""
-    
-    def __init__(self, hf_token: Optional[str] = None, max_steps: int = 20):
-        self.model = HfApiModel(
-            model_id="{config.get('model_id', 'meta-llama/Llama-2-70b-chat-hf')}",
-            token=hf_token or os.getenv("HF_TOKEN")
+    def _create_agent_file(self, agent_name: str, config: Dict, tool_meta: List[tuple], path: str) -> str:
+        """Creates the main agent file and returns its source"""
+        agent_content = render_agent(
+            agent_name,
+            model_id=config.get('model_id', 'meta-llama/Llama-2-70b-chat-hf'),
+            system_prompt=config.get('system_prompt', ''),
+            tools=[lower for _, lower, _, _ in tool_meta],
+            imports=config.get('imports', [])
         )
         
-        # Initialize DuckDuckGoSearchTool
-        self.search_tool = DuckDuckGoSearchTool()
-        
-        self.agent = CodeAgent(
-            tools=[
-                self.search_tool,  # Add search tool first
-                {", ".join(f"{t['name'].lower()}" for t in tools)}
-            ],
-            model=self.model,
-            max_steps=max_steps,
-            system_prompt="""{config.get('system_prompt', '')}""",
-            additional_authorized_imports=[
-                "os", "json", "typing", "smolagents", "requests"
-            ] + {config.get('imports', [])}
-        )
-    
-    def run(self, prompt: str, custom_max_steps: Optional[int] = None) -> str:
-        """Run the agent with the given prompt"""
-        try:
-            if custom_max_steps is not None:
-                temp_agent = CodeAgent(
-                    tools=self.agent.tools,
-                    model=self.model,
-                    max_steps=custom_max_steps,
-                    system_prompt=self.agent._system_prompt,
-                    additional_authorized_imports=self.agent._additional_authorized_imports
-                )
-                result = temp_agent.run(prompt)
-            else:
-                result = self.agent.run(prompt)
-            return json.dumps({{"status": "success", "result": result}})
-        except Exception as e:
-            return json.dumps({{"status": "error", "error": str(e)}})
-'''
-        
         # Write to both locations
-        with open(os.path.join(path, 'src', 'agent.py'), 'w') as f:
-            f.write(agent_content)
-        with open(os.path.join(path, 'src', '__init__.py'), 'w') as f:
-            f.write(f"from .agent import {agent_name}Agent")
+        _write_all(os.path.join(path, 'src', 'agent.py'), agent_content)
+        _write_all(os.path.join(path, 'src', '__init__.py'), render_package_init(agent_name))
+        return agent_content
 
     def _create_example(self, agent_name: str, path: str):
         """Creates example usage file"""
-        example_content = f'''
-from {agent_name.lower()}_agent import create_agent
-
-def main():
-    # Initialize the agent
-    agent = create_agent(max_steps=30)
-    
-    # Example prompts
-    prompts = [
-        "Example task 1",
-        "Example task 2"
-    ]
-    
-    # Run examples
-    for prompt in prompts:
-        print(f"\\nPrompt: {prompt}")
-        result = agent.run(prompt)
-        print(f"Result: {result}")
-
-if __name__ == "__main__":
-    main()
-'''
-        with open(os.path.join(path, 'examples', 'basic_usage.py'), 'w') as f:
-            f.write(example_content)
+        _write_all(os.path.join(path, 'examples', 'basic_usage.py'), render_example(agent_name.lower()))
 
-    def _create_documentation(self, agent_name: str, tools: List[Dict], path: str):
+    def _create_documentation(self, agent_name: str, tool_meta: List[tuple], path: str):
         """Creates documentation files"""
-        readme_content = f'''
-# {agent_name} Agent
-
-Auto-generated CodeAgent with specific capabilities.
-
-## Directory Structure
-```
-{agent_name}/
-├── src/
-│   ├── tools/
-│   ├── agent.py
-│   └── __init__.py
-├── tests/
-├── examples/
-├── docs/
-└── README.md
-```
-
-## Installation
-```bash
-pip install -r requirements.txt
-```
-
-## Usage
-```python
-from {agent_name.lower()}_agent import create_agent
-
-# Initialize with custom settings
-agent = create_agent(
-    hf_token="your_token_here",
-    max_steps=30
-)
-
-# Run the agent
-response = agent.run("your prompt here")
-```
+        tool_lines = "".join(
+            f"- {name}: {'' if description is None else description}\n"
+            for name, _, description, _ in tool_meta
+        )
+        _write_all(
+            os.path.join(path, 'README.md'),
+            b"".join([render_readme_head(agent_name), tool_lines.encode(), README_TAIL])
+        )
 
-## Available Tools
-{chr(10).join(f"- {t['name']}: {t.get('description', '')}" for t in tools)}
+    def _create_tool_file(self, name: str, lower: str, description: Optional[str], tools_dir: str):
+        """Creates a tool module from the tool template"""
+        tool_content = render_tool(
+            tool_name=name,
+            description='Tool description' if description is None else description,
+            tool_lower=lower
+        )
+        _write_all(os.path.join(tools_dir, f"{lower}.py"), tool_content)
+
+    def _create_tools_init(self, agent_name: str, tool_meta: List[tuple], tools_dir: str):
+        """Creates the tools package __init__.py"""
+        # Encode each line as it is produced and join once into a single write
+        _write_all(
+            os.path.join(tools_dir, '__init__.py'),
+            b"".join([
+                render_tools_init_header(agent_name),
+                *(f"from .{lower} import {lower}\n".encode() for _, lower, _, _ in tool_meta)
+            ])
+        )
 
-## Documentation
-See the `docs/` directory for detailed documentation.
-'''
-        with open(os.path.join(path, 'README.md'), 'w') as f:
-            f.write(readme_content)
+    def _create_requirements(self, requirements: Optional[str], path: str):
+        """Creates requirements.txt"""
+        req_list = [r.strip() for r in requirements.split(",") if r.strip()] if requirements else []
+        # The base requirements are pre-encoded; only the extras need encoding
+        data = BASE_REQUIREMENTS
+        if req_list:
+            data += b"\n" + "\n".join(req_list).encode()
+        _write_all(os.path.join(path, 'requirements.txt'), data)
 
     def forward(
         self,
@@ -224,15 +152,21 @@ See the `docs/` directory for detailed documentation.
         output_path: str,
         tools_config: str,
         agent_config: str,
-        requirements: Optional[str] = None
+        requirements: Optional[str] = None,
+        include_agent_source: Optional[bool] = False
     ) -> str:
         """
         Creates complete agent structure
         """
         try:
             # Parse configurations
-            tools = json.loads(tools_config)
-            config = json.loads(agent_config)
+            tools = _loads_cached(tools_config)
+            config = _loads_cached(agent_config)
+            # (name, lowercased name, description, has file) per tool, shared by all writers
+            tool_meta = [
+                (t['name'], t['name'].lower(), t.get('description'), 'file_path' in t)
+                for t in tools
+            ]
             
             # Create full agent path
             agent_path = os.path.join(output_path, agent_name)
@@ -240,55 +174,40 @@ See the `docs/` directory for detailed documentation.
             # Create directory structure
             directories = self._create_directory_structure(agent_path)
             
-            # Create tools
-            for tool in tools:
-                if 'file_path' in tool:
-                    tool_content = self._generate_tool_template(
-                        tool_name=tool['name'],
-                        description=tool.get('description', 'Tool description')
-                    )
-                    tool_path = os.path.join(directories['tools'], f"{tool['name'].lower()}.py")
-                    with open(tool_path, "w") as f:
-                        f.write(tool_content)
+            # The files are independent of each other, so write them in
+            # parallel; on slow or network disks the writes dominate
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                futures = [
+                    executor.submit(self._create_tool_file, name, lower, description, directories['tools'])
+                    for name, lower, description, has_file in tool_meta
+                    if has_file
+                ]
+                futures.append(executor.submit(self._create_tools_init, agent_name, tool_meta, directories['tools']))
+                agent_future = executor.submit(self._create_agent_file, agent_name, config, tool_meta, agent_path)
+                futures.append(executor.submit(self._create_example, agent_name, agent_path))
+                futures.append(executor.submit(self._create_documentation, agent_name, tool_meta, agent_path))
+                futures.append(executor.submit(self._create_requirements, requirements, agent_path))
+
+                for future in futures:
+                    future.result()
+                agent_content = agent_future.result()
             
-            # Create __init__.py files
-            with open(os.path.join(directories['tools'], '__init__.py'), 'w') as f:
-                f.write(f"# Tools for {agent_name}\n")
-                for tool in tools:
-                    f.write(f"from .{tool['name'].lower()} import {tool['name'].lower()}\n")
-            
-            # Create main agent file
-            self._create_agent_file(agent_name, config, tools, agent_path)
-            
-            # Create example
-            self._create_example(agent_name, agent_path)
-            
-            # Create documentation
-            self._create_documentation(agent_name, tools, agent_path)
-            
-            # Create requirements.txt
-            base_requirements = [
-                "smolagents>=1.2.2",
-                "huggingface-hub>=0.19.0",
+            # Only the paths vary, so splice their JSON encodings into the
+            # fixed result instead of encoding a fresh dict. The message
+            # prefix needs no escaping, so it can share the quoted path
+            quoted_path = dumps(agent_path)
+            parts = [
+                _SUCCESS_PREFIX, quoted_path[1:],
+                ',"agent_path":', quoted_path,
+                ',"directories":', dumps(directories)
             ]
-            if requirements:
-                req_list = [r.strip() for r in requirements.split(",") if r.strip()]
-                all_requirements = base_requirements + req_list
-            else:
-                all_requirements = base_requirements
-                
-            with open(os.path.join(agent_path, 'requirements.txt'), 'w') as f:
-                f.write("\n".join(all_requirements))
-            
-            return json.dumps({
-                "status": "success",
-                "message": f"Agent structure created at {agent_path}",
-                "agent_path": agent_path,
-                "directories": directories
-            })
+            if include_agent_source:
+                parts += [',"agent_py_content":', dumps(agent_content)]
+            parts.append('}')
+            return ''.join(parts)
             
         except Exception as e:
-            return json.dumps({
+            return dumps({
                 "status": "error",
                 "error": str(e)
             })
@@ -1,10 +1,34 @@
 from smolagents import Tool
-import subprocess
-import sys
-import pkg_resources
-import os
-from typing import List, Dict, Optional
-import json
+from importlib.metadata import version, PackageNotFoundError
+import threading
+from typing import Optional
+from .._json import dumps
+
+# pip is not safe to run concurrently against the same environment
+_PIP_LOCK = threading.Lock()
+
+def _is_satisfied(req: str) -> bool:
+    """Whether an installed distribution already satisfies req"""
+    try:
+        from packaging.requirements import InvalidRequirement, Requirement
+    except ImportError:
+        # Without packaging only bare names can be checked
+        if any(op in req for op in "<>=!~@;["):
+            return False
+        name, spec = req, None
+    else:
+        try:
+            parsed = Requirement(req)
+        except InvalidRequirement:
+            return False
+        if parsed.url or parsed.marker is not None:
+            return False
+        name, spec = parsed.name, parsed.specifier
+    try:
+        installed = version(name)
+    except PackageNotFoundError:
+        return False
+    return spec is None or spec.contains(installed, prereleases=True)
 
 class DependencyInstallerTool(Tool):
     """Tool for installing Python dependencies"""
@@ -35,20 +59,46 @@ class DependencyInstallerTool(Tool):
         Returns:
             str: JSON string with installation results
         """
-        pip_cmd = pip_command or [sys.executable, "-m", "pip"]
         results = {}
         
         # Split requirements string into list
         req_list = [r.strip() for r in requirements.split(",") if r.strip()]
         
+        # Skip pip (and its startup cost) for requirements already met
+        missing = []
         for req in req_list:
+            if _is_satisfied(req):
+                results[req] = "Already satisfied"
+            else:
+                missing.append(req)
+
+        if not missing:
+            return dumps(results)
+
+        # Imported lazily: only needed when something is actually installed
+        import subprocess
+        import sys
+
+        pip_cmd = pip_command or [sys.executable, "-m", "pip"]
+
+        with _PIP_LOCK:
+            # One pip run resolves and installs everything at once; pip
+            # installs nothing if any requirement fails, so only then fall
+            # back to installing one by one to find the failing ones. stdout
+            # is discarded: an unread pipe blocks pip once its buffer fills
             try:
-                subprocess.check_call([*pip_cmd, "install", req], stdout=subprocess.PIPE)
-                results[req] = "Successfully installed"
-            except subprocess.CalledProcessError as e:
-                results[req] = f"Failed to install: {str(e)}"
+                subprocess.run([*pip_cmd, "install", *missing], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+                results.update(dict.fromkeys(missing, "Successfully installed"))
+            except subprocess.CalledProcessError:
+                for req in missing:
+                    try:
+                        subprocess.run([*pip_cmd, "install", req], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
+                        results[req] = "Successfully installed"
+                    except subprocess.CalledProcessError as e:
+                        stderr = e.stderr.decode(errors="replace").strip() if e.stderr else ""
+                        results[req] = f"Failed to install: {str(e)}" + (f"\n{stderr}" if stderr else "")
         
-        return json.dumps(results)
+        return dumps(results)
 
 class DependencyCheckerTool(Tool):
     """Tool for checking installed Python dependencies"""
@@ -73,7 +123,6 @@ class DependencyCheckerTool(Tool):
         Returns:
             str: JSON string with check results
         """
-        installed_packages = {pkg.key: pkg.version for pkg in pkg_resources.working_set}
         results = {}
         
         # Split requirements string into list
@@ -81,9 +130,14 @@ class DependencyCheckerTool(Tool):
         
         for req in req_list:
             pkg_name = req.split('==')[0].split('>=')[0].strip()
-            results[req] = pkg_name.lower() in installed_packages
+            # Look up only the queried distributions instead of scanning all
+            try:
+                version(pkg_name)
+                results[req] = True
+            except PackageNotFoundError:
+                results[req] = False
         
-        return json.dumps(results)
+        return dumps(results)
 
 # Create instances of the tools
 install_dependencies = DependencyInstallerTool()
@@ -1,9 +1,261 @@
 from smolagents import Tool
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import List, Dict, Optional, Any
+from concurrent.futures import Future, ThreadPoolExecutor
+import contextvars
+import functools
+import hashlib
+import importlib.util
+import itertools
+import os
 import re
 import json
+import threading
+import time
+from .._json import dumps, loads
+
+# One pooled session for every request, so calls to the same host
+# (duckduckgo.com, huggingface.co) reuse their TCP/TLS connections.
+# Transient failures and rate limiting are retried with a short backoff;
+# after the last retry the error response is returned as is
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=2,
+        connect=2,
+        read=2,
+        backoff_factor=0.2,
+        status_forcelist=(429, 502, 503, 504),
+        raise_on_status=False
+    )
+)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept-Encoding': 'gzip, deflate'
+})
+# (connect, read) seconds, so one hung request cannot stall a search
+_TIMEOUT = (3, 7)
+# Concurrent requests per search; kept small to stay polite to the hosts
+_SEARCH_CONCURRENCY = 8
+# Candidates fetched by the initial wide search, per requested result
+_WIDE_SEARCH_FACTOR = 4
+
+# Requests currently in flight, so concurrent searches (e.g. from
+# search_and_validate_spaces) asking for the same URL share one response
+_INFLIGHT: Dict[tuple, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+def _get_json_coalesced(url: str, params: Dict[str, Any]) -> Any:
+    """GET url and decode its JSON body, sharing identical concurrent requests
+
+    Error statuses (including a 429 or 5xx left after the retries) raise
+    requests.HTTPError. The decoded value is shared between callers and
+    must not be mutated.
+    """
+    key = (url, tuple(sorted(params.items())))
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(key)
+        owner = future is None
+        if owner:
+            future = _INFLIGHT[key] = Future()
+    if not owner:
+        return future.result()
+
+    try:
+        response = _SESSION.get(url, params=params, timeout=_TIMEOUT)
+        response.raise_for_status()
+        value = loads(response.content)
+        future.set_result(value)
+        return value
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _INFLIGHT_LOCK:
+            del _INFLIGHT[key]
+
+# lxml (listed in requirements.txt) streams DuckDuckGo result pages through
+# its pull parser; without it whole pages are parsed by _parse_results
+_HAS_LXML = importlib.util.find_spec('lxml') is not None
+# Optional: web searches through duckduckgo_search's JSON API instead of
+# scraping the HTML result page
+_HAS_DDGS = importlib.util.find_spec('duckduckgo_search') is not None
+# Optional: C-based HTML parsing of whole result pages when lxml is missing
+_HAS_SELECTOLAX = importlib.util.find_spec('selectolax') is not None
+# Optional: Aho-Corasick automaton for matching many ranking terms at once
+_HAS_AHOCORASICK = importlib.util.find_spec('ahocorasick') is not None
+
+def _substring_matcher(terms: List[str]):
+    """
+    Build a function returning which of terms occur in a text
+
+    With pyahocorasick all terms are found in one pass over the text;
+    otherwise each term is scanned for separately.
+    """
+    unique = {term for term in terms if term}
+    # An empty term is a substring of every text
+    always = frozenset(('',)) if '' in terms else frozenset()
+    if _HAS_AHOCORASICK and unique:
+        import ahocorasick
+
+        automaton = ahocorasick.Automaton()
+        for term in unique:
+            automaton.add_word(term, term)
+        automaton.make_automaton()
+        return lambda text: always | {term for _, term in automaton.iter(text)}
+    return lambda text: always | {term for term in unique if term in text}
+
+SEARCH_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "dynamic_agent_generator", "search")
+_CACHE_ENABLED = True
+# Entries each cached forward() keeps in memory in front of the disk cache
+_MEMORY_CACHE_SIZE = 1024
+_MEMORY_CACHES: List[Dict] = []
+# Guards the in-memory caches, which concurrent searches share
+_CACHE_LOCK = threading.Lock()
+
+def _bounded_put(cache: Dict, key, entry, size: int):
+    """Store entry under key, evicting the oldest entry once cache holds size entries"""
+    with _CACHE_LOCK:
+        cache.pop(key, None)
+        if len(cache) >= size:
+            # Dicts keep insertion order, so the first key is the oldest
+            cache.pop(next(iter(cache)), None)
+        cache[key] = entry
+
+def set_cache_enabled(enabled: bool):
+    """Globally enable or disable the on-disk search cache"""
+    global _CACHE_ENABLED
+    _CACHE_ENABLED = enabled
+
+def clear_cache(path: str = SEARCH_CACHE_DIR):
+    """Drop all cached search, validation and web-research results"""
+    import shutil
+
+    with _CACHE_LOCK:
+        for memory in _MEMORY_CACHES:
+            memory.clear()
+        HuggingFaceSpaceSearchTool._keyword_cache.clear()
+        HuggingFaceSpaceSearchTool._trending_cache.clear()
+    shutil.rmtree(path, ignore_errors=True)
+
+# Web research behind the Space search is reused for this long, per query
+_RESEARCH_TTL = 600
+_RESEARCH_CACHE_SIZE = 256
+
+def _research_cache_get(cache: Dict[str, tuple], query: str):
+    """Cached value for query if it has not expired, else None"""
+    entry = cache.get(query)
+    if entry is not None and time.time() - entry[0] < _RESEARCH_TTL:
+        return entry[1]
+    return None
+
+def _research_cache_put(cache: Dict[str, tuple], query: str, value):
+    """Store value for query, evicting the oldest entry when full, and return it"""
+    _bounded_put(cache, query, (time.time(), value), _RESEARCH_CACHE_SIZE)
+    return value
+
+# Per-call state of the innermost _ttl_cache call running in this context
+_CALL_STATE: contextvars.ContextVar = contextvars.ContextVar('_CALL_STATE', default=None)
+
+def _skip_cache():
+    """Keep the result of the cached call in progress out of the cache, e.g. after a failed request"""
+    state = _CALL_STATE.get()
+    if state is not None:
+        state['skip'] = True
+
+def _ttl_cache(ttl: int, path: str = SEARCH_CACHE_DIR):
+    """Cache a tool's forward() results on disk for ttl seconds
+
+    String arguments are canonicalized (stripped, lowercased) for the key.
+    Recent entries are also kept in memory so repeat calls in the same
+    process skip the disk read. Results with status "error", and results of
+    calls that invoked _skip_cache, are not cached.
+    functools.wraps keeps the original signature visible to smolagents.
+    """
+    def decorator(func):
+        memory = {}
+        _MEMORY_CACHES.append(memory)
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not _CACHE_ENABLED:
+                return func(self, *args, **kwargs)
+
+            canonical = [a.strip().lower() if isinstance(a, str) else a for a in args]
+            canonical_kwargs = {
+                k: v.strip().lower() if isinstance(v, str) else v
+                for k, v in sorted(kwargs.items())
+            }
+            key = hashlib.sha256(json.dumps(
+                [func.__qualname__, canonical, canonical_kwargs], default=str
+            ).encode()).hexdigest()
+            entry = memory.get(key)
+            if entry is not None and time.time() - entry[0] < ttl:
+                return entry[1]
+
+            cache_file = os.path.join(path, f"{key}.json")
+            try:
+                with open(cache_file, "rb") as f:
+                    entry = loads(f.read())
+                if time.time() - entry["created"] < ttl:
+                    _bounded_put(memory, key, (entry["created"], entry["value"]), _MEMORY_CACHE_SIZE)
+                    return entry["value"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+            state = {}
+            token = _CALL_STATE.set(state)
+            try:
+                value = func(self, *args, **kwargs)
+            finally:
+                _CALL_STATE.reset(token)
+            if state.get('skip'):
+                return value
+            if isinstance(value, dict):
+                failed = value.get('status') == 'error'
+            else:
+                failed = isinstance(value, str) and value.startswith(('{"status":"error"', '{"status": "error"'))
+            if failed:
+                return value
+            _bounded_put(memory, key, (time.time(), value), _MEMORY_CACHE_SIZE)
+            try:
+                os.makedirs(path, exist_ok=True)
+                with open(cache_file, "w", encoding="utf-8") as f:
+                    f.write(dumps({"created": time.time(), "value": value}))
+            except OSError:
+                pass
+            return value
+        return wrapper
+    return decorator
+
+# Term extraction patterns for the web-research helpers, compiled once
+_TECH_TERM_RE = re.compile(r'\b[A-Za-z][A-Za-z0-9-]+(?:\s+[A-Za-z][A-Za-z0-9-]+){0,2}\b')
+_LIB_TERM_RE = re.compile(r'\b[A-Za-z][A-Za-z0-9-]*(?:\.[A-Za-z][A-Za-z0-9-]*)*\b')
+_POPULARITY_RES = tuple(re.compile(p) for p in (
+    r'popular (\w+(?:[- ]\w+)*)',
+    r'trending (\w+(?:[- ]\w+)*)',
+    r'widely used (\w+(?:[- ]\w+)*)',
+    r'(\w+(?:[- ]\w+)*) is popular',
+    r'(\w+(?:[- ]\w+)*) implementation'
+))
+_IMPLEMENTATION_RE = re.compile(r'(?:using|with|based on) (\w+(?:[- ]\w+)*)')
+_WORD_RE = re.compile(r'\b\w+(?:-\w+)*\b')
+_STOPWORDS = frozenset({'the', 'and', 'for', 'with', 'using', 'from', 'that', 'this'})
+
+def _clean_terms(terms) -> set:
+    """Strip extracted terms, dropping short ones and stopwords
+
+    Terms are extracted from already lowercased text, so they need no
+    further lowercasing.
+    """
+    stripped = (term.strip() for term in terms)
+    return {term for term in stripped if len(term) > 2 and term not in _STOPWORDS}
 
 class HuggingFaceSpaceSearchTool(Tool):
     """Tool for searching Hugging Face Spaces"""
@@ -31,47 +283,55 @@ class HuggingFaceSpaceSearchTool(Tool):
     }
     output_type = "string"
 
+    # Web-research results per query as (created, value), shared by all
+    # instances. Only successful lookups are stored and callers must not
+    # mutate them
+    _keyword_cache: Dict[str, tuple] = {}
+    _trending_cache: Dict[str, tuple] = {}
+
     def _get_search_terms(self, query: str) -> List[str]:
         """Get intelligent search terms using web research"""
-        duckduckgo = DuckDuckGoSearchTool()
+        cached = _research_cache_get(self._keyword_cache, query)
+        if cached is not None:
+            return cached
         search_terms = set()
         
         try:
             # Search for related technical terms and tools
-            search_results = json.loads(duckduckgo.run(
+            # The dict API skips a JSON encode/decode round trip of the results
+            search_results = duckduckgo_search._search(
                 f"popular tools libraries frameworks for {query}"
-            ))
+            )
             
             for result in search_results['results']:
                 text = f"{result['title']} {result['snippet']}".lower()
                 
                 # Extract technical terms
-                tech_terms = re.findall(r'\b[A-Za-z][A-Za-z0-9-]+(?:\s+[A-Za-z][A-Za-z0-9-]+){0,2}\b', text)
+                tech_terms = _TECH_TERM_RE.findall(text)
                 search_terms.update(tech_terms)
                 
                 # Extract library/framework names
-                lib_terms = re.findall(r'\b[A-Za-z][A-Za-z0-9-]*(?:\.[A-Za-z][A-Za-z0-9-]*)*\b', text)
+                lib_terms = _LIB_TERM_RE.findall(text)
                 search_terms.update(lib_terms)
             
             # Clean up terms
-            search_terms = {
-                term.strip() for term in search_terms 
-                if len(term.strip()) > 2 and not term.strip().lower() in {
-                    'the', 'and', 'for', 'with', 'using', 'from', 'that', 'this'
-                }
-            }
+            search_terms = _clean_terms(search_terms)
             
             # Always include the original query terms
             search_terms.update(query.split())
             
-            return list(search_terms)
+            return _research_cache_put(self._keyword_cache, query, list(search_terms))
             
         except Exception:
+            # Don't let a search built on the fallback terms be cached
+            _skip_cache()
             return query.split()
 
     def _get_trending_context(self, query: str) -> Dict[str, Any]:
         """Get trending/popular names and terms related to the query"""
-        duckduckgo = DuckDuckGoSearchTool()
+        cached = _research_cache_get(self._trending_cache, query)
+        if cached is not None:
+            return cached
         trending_info = {
             'popular_names': set(),
             'common_implementations': set(),
@@ -80,54 +340,42 @@ class HuggingFaceSpaceSearchTool(Tool):
         
         try:
             # Search for trending/popular implementations
-            search_results = json.loads(duckduckgo.run(
+            search_results = duckduckgo_search._search(
                 f"most popular {query} models implementations trending github huggingface"
-            ))
+            )
             
             for result in search_results['results']:
                 text = f"{result['title']} {result['snippet']}".lower()
                 
                 # Look for popularity indicators
-                popularity_patterns = [
-                    r'popular (\w+(?:[- ]\w+)*)',
-                    r'trending (\w+(?:[- ]\w+)*)',
-                    r'widely used (\w+(?:[- ]\w+)*)',
-                    r'(\w+(?:[- ]\w+)*) is popular',
-                    r'(\w+(?:[- ]\w+)*) implementation'
-                ]
-                
-                for pattern in popularity_patterns:
-                    matches = re.findall(pattern, text)
-                    trending_info['popular_names'].update(matches)
+                for pattern in _POPULARITY_RES:
+                    trending_info['popular_names'].update(pattern.findall(text))
                 
                 # Look for specific implementation mentions
                 if 'implementation' in text or 'based on' in text:
-                    implementations = re.findall(r'(?:using|with|based on) (\w+(?:[- ]\w+)*)', text)
+                    implementations = _IMPLEMENTATION_RE.findall(text)
                     trending_info['common_implementations'].update(implementations)
                 
                 # Extract trending terms
                 if any(word in text for word in ['trending', 'popular', 'latest', 'new']):
-                    terms = re.findall(r'\b\w+(?:-\w+)*\b', text)
+                    terms = _WORD_RE.findall(text)
                     trending_info['trending_terms'].update(terms)
             
             # Clean up the sets
             for key in trending_info:
-                trending_info[key] = {
-                    term.strip() for term in trending_info[key]
-                    if len(term.strip()) > 2 and not term.strip().lower() in {
-                        'the', 'and', 'for', 'with', 'using', 'from', 'that', 'this'
-                    }
-                }
+                trending_info[key] = _clean_terms(trending_info[key])
             
-            return trending_info
+            return _research_cache_put(self._trending_cache, query, trending_info)
             
         except Exception:
+            _skip_cache()
             return {
                 'popular_names': set(),
                 'common_implementations': set(),
                 'trending_terms': set()
             }
 
+    @_ttl_cache(ttl=24 * 3600)
     def forward(
         self, 
         query: str, 
@@ -142,14 +390,20 @@ class HuggingFaceSpaceSearchTool(Tool):
             max_results: Maximum number of results to return
             sort_by: Sort method (trending, created, modified, likes)
         """
+        if max_results is None:
+            max_results = 5
+
         # Validate sort_by parameter
         valid_sort_options = ["trending", "created", "modified", "likes"]
         if sort_by not in valid_sort_options:
             sort_by = "trending"  # Default to trending if invalid option provided
         
-        # Get both search terms and trending context
-        search_terms = self._get_search_terms(query)
-        trending_context = self._get_trending_context(query)
+        # Get both search terms and trending context (independent web searches)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # Run in a copy of this context so a failure can still skip the cache
+            terms_future = executor.submit(contextvars.copy_context().run, self._get_search_terms, query)
+            trending_context = self._get_trending_context(query)
+            search_terms = terms_future.result()
         
         all_results = []
         found_spaces = set()
@@ -172,78 +426,110 @@ class HuggingFaceSpaceSearchTool(Tool):
             for term in search_terms:
                 search_variations.append(f"{popular_name} {term}")
         
-        # Deduplicate and clean search variations
-        search_variations = list(set(
-            variation.strip() 
+        # Deduplicate and clean search variations. HF search is case
+        # insensitive, so variations differing only in case are one request;
+        # dict.fromkeys keeps the priority order built above
+        search_variations = list(dict.fromkeys(
+            variation.strip().lower()
             for variation in search_variations 
             if variation.strip()
         ))
         
-        for search_query in search_variations:
+        # Set when a Hub request fails, so the incomplete result is not cached
+        failed = []
+
+        def fetch(search_query: str, limit: int = max_results) -> List[Dict]:
+            # Use HF's space search URL with correct sort parameter
             try:
-                # Use HF's space search URL with correct sort parameter
-                search_url = f"https://huggingface.co/api/spaces?search={search_query}&sort={sort_by}&limit={max_results}"
-                response = requests.get(search_url)
-                
-                if response.status_code == 200:
-                    spaces = response.json()
+                return _get_json_coalesced(
+                    "https://huggingface.co/api/spaces",
+                    {'search': search_query, 'sort': sort_by, 'limit': limit}
+                )
+            except Exception:
+                failed.append(search_query)
+                return []
+
+        # Lowercase the ranking terms once rather than per candidate Space
+        popular_lower = [term.lower() for term in trending_context['popular_names']]
+        implementations_lower = [term.lower() for term in trending_context['common_implementations']]
+        trending_lower = [term.lower() for term in trending_context['trending_terms']]
+        search_terms_lower = [(term, term.lower()) for term in search_terms]
+        match_terms = _substring_matcher(
+            popular_lower + implementations_lower + trending_lower
+            + [term_lower for _, term_lower in search_terms_lower]
+        )
+
+        def add_candidates(spaces: List[Dict], quota: Optional[int]) -> bool:
+            """Score and collect unseen Spaces, up to quota results; True once it is met"""
+            try:
+                for space in spaces:
+                    if quota is not None and len(all_results) >= quota:
+                        break
+
+                    space_id = f"{space['owner']}/{space['id']}"
                     
-                    for space in spaces:
-                        space_id = f"{space['owner']}/{space['id']}"
-                        
-                        if space_id in found_spaces:
-                            continue
-                            
-                        # Calculate trending score
-                        trending_score = 0
-                        space_text = f"{space['title']} {space.get('description', '')}".lower()
-                        
-                        # Add points for matching trending terms
-                        for term in trending_context['popular_names']:
-                            if term.lower() in space_text:
-                                trending_score += 3  # Higher weight for popular names
-                        
-                        for term in trending_context['common_implementations']:
-                            if term.lower() in space_text:
-                                trending_score += 2  # Medium weight for common implementations
-                        
-                        for term in trending_context['trending_terms']:
-                            if term.lower() in space_text:
-                                trending_score += 1  # Lower weight for general trending terms
-                        
-                        # Extract relevant information
-                        space_info = {
-                            'space_id': space_id,
-                            'title': space['title'],
-                            'description': space.get('description', ''),
-                            'url': f"https://huggingface.co/spaces/{space_id}",
-                            'likes': space.get('likes', 0),
-                            'downloads': space.get('downloads', 0),
-                            'last_modified': space.get('lastModified', ''),
-                            'sdk': space.get('sdk', ''),
-                            'verified': space.get('verified', False),
-                            'matched_terms': [
-                                term for term in search_terms 
-                                if term.lower() in space_text
-                            ],
-                            'trending_score': trending_score,
-                            'matches_popular_name': any(
-                                name.lower() in space_text 
-                                for name in trending_context['popular_names']
-                            )
-                        }
-                        
-                        all_results.append(space_info)
-                        found_spaces.add(space_id)
-                        
-                        if len(all_results) >= max_results:
-                            break
-                            
-            except Exception as e:
-                continue
-                
-            if len(all_results) >= max_results:
-                break
+                    if space_id in found_spaces:
+                        continue
+                    
+                    # Calculate trending score
+                    space_text = f"{space['title']} {space.get('description', '')}".lower()
+                    matched = match_terms(space_text)
+                    
+                    # Add points for matching trending terms: popular names weigh
+                    # most, then common implementations, then general trending terms
+                    trending_score = (
+                        3 * sum(term in matched for term in popular_lower)
+                        + 2 * sum(term in matched for term in implementations_lower)
+                        + sum(term in matched for term in trending_lower)
+                    )
+                    
+                    # Extract relevant information
+                    all_results.append({
+                        'space_id': space_id,
+                        'title': space['title'],
+                        'description': space.get('description', ''),
+                        'url': f"https://huggingface.co/spaces/{space_id}",
+                        'likes': space.get('likes', 0),
+                        'downloads': space.get('downloads', 0),
+                        'last_modified': space.get('lastModified', ''),
+                        'sdk': space.get('sdk', ''),
+                        'verified': space.get('verified', False),
+                        'matched_terms': [
+                            term for term, term_lower in search_terms_lower
+                            if term_lower in matched
+                        ],
+                        'trending_score': trending_score,
+                        'matches_popular_name': any(
+                            name in matched for name in popular_lower
+                        )
+                    })
+                    found_spaces.add(space_id)
+            except Exception:
+                pass
+            return quota is not None and len(all_results) >= quota
+
+        # One wide search for the original query usually returns enough
+        # candidates to rank locally, so it replaces the variation fan-out
+        # unless it comes back short
+        add_candidates(fetch(query, max_results * _WIDE_SEARCH_FACTOR), None)
+        if len(all_results) < max_results:
+            original = query.strip().lower()
+            search_variations = [v for v in search_variations if v != original]
+
+            # The variations are fetched a window at a time, in parallel within
+            # each window, and still processed in order so ranking is unchanged
+            executor = ThreadPoolExecutor(max_workers=_SEARCH_CONCURRENCY)
+            try:
+                for start in range(0, len(search_variations), _SEARCH_CONCURRENCY):
+                    window = search_variations[start:start + _SEARCH_CONCURRENCY]
+                    if any(add_candidates(spaces, max_results) for spaces in executor.map(fetch, window)):
+                        break
+            finally:
+                # Once the quota is met, don't wait for the rest of the window's
+                # requests; they finish in the background and are discarded
+                executor.shutdown(wait=False)
+        if failed:
+            _skip_cache()
         
         # Sort results by a combination of factors
         all_results.sort(
@@ -256,7 +542,7 @@ class HuggingFaceSpaceSearchTool(Tool):
             reverse=True
         )
         
-        return json.dumps({
+        return dumps({
             'status': 'success',
             'query': query,
             'search_terms': search_terms,
@@ -277,30 +563,159 @@ class SpaceValidatorTool(Tool):
         "space_id": {
             "type": "string",
             "description": "The Hugging Face Space ID to validate"
+        },
+        "check_gradio": {
+            "type": "boolean",
+            "description": "Also check whether the Space uses Gradio (set false to only check existence)",
+            "nullable": True,
+            "default": True
         }
     }
     output_type = "string"
 
-    def forward(self, space_id: str) -> str:
+    @_ttl_cache(ttl=6 * 3600)
+    def forward(self, space_id: str, check_gradio: Optional[bool] = True) -> str:
         """
         Validate if a Hugging Face Space exists and is accessible
         
         Args:
             space_id: The Hugging Face Space ID to validate
+            check_gradio: Also check whether the Space uses Gradio
         
         Returns:
-            str: JSON string with validation results
+            str: JSON string with validation results; is_gradio is null
+            when check_gradio is false. Statuses other than 200 and 404
+            give a status "error" result
         """
-        url = f"https://huggingface.co/spaces/{space_id}"
-        response = requests.get(url)
+        # The Space API returns a few KB of JSON including the SDK, instead
+        # of the full Space page that would have to be scanned for "gradio".
+        # Existence alone only needs the status line, so HEAD it
+        url = f"https://huggingface.co/api/spaces/{space_id}"
+        if check_gradio is False:
+            response = _SESSION.head(url, allow_redirects=True, timeout=_TIMEOUT)
+        else:
+            response = _SESSION.get(url, timeout=_TIMEOUT)
         
+        # Only a 404 says the Space is missing; anything but 200 otherwise
+        # (rate limiting, server errors) is an error, which is not cached
+        if response.status_code not in (200, 404):
+            return dumps({
+                'status': 'error',
+                'error': f"Unexpected HTTP status {response.status_code} for Space {space_id}"
+            })
+        exists = response.status_code == 200
         results = {
-            'exists': response.status_code == 200,
-            'is_gradio': 'gradio' in response.text.lower() if response.status_code == 200 else False,
-            'is_accessible': response.status_code == 200
+            'exists': exists,
+            'is_gradio': None if check_gradio is False else exists and response.json().get('sdk') == 'gradio',
+            'is_accessible': exists
+        }
+        
+        return dumps(results)
+
+class SpaceSearchAndValidateTool(Tool):
+    """Tool for searching and validating Spaces for several capabilities at once"""
+    
+    name = "search_and_validate_spaces"
+    description = (
+        "Search Hugging Face Spaces for several capabilities at once and validate the results. "
+        "Prefer this over calling search_huggingface_spaces and validate_space per capability"
+    )
+    inputs = {
+        "capabilities": {
+            "type": "array",
+            "description": "List of capabilities to find Spaces for"
+        },
+        "max_results": {
+            "type": "integer",
+            "description": "Maximum number of Spaces to return per capability",
+            "nullable": True,
+            "default": 3
         }
+    }
+    output_type = "string"
+
+    def forward(self, capabilities: List[str], max_results: Optional[int] = 3) -> str:
+        """
+        Search and validate Spaces for all capabilities concurrently
         
-        return json.dumps(results)
+        Args:
+            capabilities: List of capabilities to find Spaces for
+            max_results: Maximum number of Spaces to return per capability
+        
+        Returns:
+            str: JSON string mapping each capability to its validated Spaces
+        """
+        if not capabilities:
+            return dumps({'status': 'success', 'results': {}})
+
+        def search(capability: str) -> List[Dict]:
+            try:
+                return loads(search_huggingface_spaces.forward(
+                    query=capability, max_results=max_results
+                )).get('results', [])
+            except Exception:
+                return []
+
+        def validate(space_id: str) -> Dict:
+            try:
+                return loads(validate_space.forward(space_id=space_id))
+            except Exception as e:
+                return {'exists': False, 'error': str(e)}
+
+        # Network-bound: the searches, then all validations, each run at once
+        with ThreadPoolExecutor(max_workers=min(8, len(capabilities))) as executor:
+            found = dict(zip(capabilities, executor.map(search, capabilities)))
+            space_ids = list(dict.fromkeys(
+                space['space_id'] for spaces in found.values() for space in spaces
+            ))
+            validations = dict(zip(space_ids, executor.map(validate, space_ids)))
+
+        return dumps({
+            'status': 'success',
+            'results': {
+                capability: [
+                    {**space, 'validation': validations[space['space_id']]}
+                    for space in spaces
+                ]
+                for capability, spaces in found.items()
+            }
+        })
+
+def _iter_ddg_results(response):
+    """
+    Yield the result <div>s of a streamed DuckDuckGo page as they complete
+
+    The page is fed to lxml's pull parser chunk by chunk, so a caller that
+    stops after max_results never downloads or parses the rest of it.
+    """
+    from lxml import etree
+
+    parser = etree.HTMLPullParser(events=('end',), tag='div', encoding=response.encoding or 'utf-8')
+    for chunk in response.iter_content(chunk_size=8192):
+        parser.feed(chunk)
+        for _, element in parser.read_events():
+            if 'result' in (element.get('class') or '').split():
+                yield element
+    parser.close()
+    for _, element in parser.read_events():
+        if 'result' in (element.get('class') or '').split():
+            yield element
+
+def _ddg_result_info(element) -> Optional[Dict]:
+    """Title, url and snippet of one DuckDuckGo result <div>, if it has a title link"""
+    links = {}
+    for link in element.iter('a'):
+        for cls in (link.get('class') or '').split():
+            links.setdefault(cls, link)
+    title_elem = links.get('result__a')
+    if title_elem is None:
+        return None
+    snippet_elem = links.get('result__snippet')
+    return {
+        'title': ''.join(title_elem.itertext()).strip(),
+        'url': title_elem.get('href'),
+        'snippet': ''.join(snippet_elem.itertext()).strip() if snippet_elem is not None else ""
+    }
 
 class DuckDuckGoSearchTool(Tool):
     """Tool for performing web searches using DuckDuckGo"""
@@ -321,6 +736,94 @@ class DuckDuckGoSearchTool(Tool):
     }
     output_type = "string"
 
+    @staticmethod
+    def _parse_results(html: str, max_results: int) -> List[Dict]:
+        """Extract results from a whole result page with selectolax or BeautifulSoup"""
+        results = []
+        if _HAS_SELECTOLAX:
+            from selectolax.lexbor import LexborHTMLParser
+
+            for result in LexborHTMLParser(html).css('.result')[:max_results]:
+                title_elem = result.css_first('a.result__a')
+                snippet_elem = result.css_first('a.result__snippet')
+                
+                if title_elem is not None:
+                    results.append({
+                        'title': title_elem.text().strip(),
+                        'url': title_elem.attributes.get('href'),
+                        'snippet': snippet_elem.text().strip() if snippet_elem is not None else ""
+                    })
+            return results
+
+        from bs4 import BeautifulSoup
+
+        for result in BeautifulSoup(html, 'html.parser').select('.result')[:max_results]:
+            title_elem = result.find('a', class_='result__a')
+            snippet_elem = result.find('a', class_='result__snippet')
+            
+            if title_elem:
+                result_info = {
+                    'title': title_elem.text.strip(),
+                    'url': title_elem['href'],
+                    'snippet': snippet_elem.text.strip() if snippet_elem else ""
+                }
+                results.append(result_info)
+        return results
+
+    @_ttl_cache(ttl=3600)
+    def _search(self, query: str, max_results: int = 5) -> Dict[str, Any]:
+        """Search DuckDuckGo and return the result dict (shared when cached, do not mutate)"""
+        if _HAS_DDGS:
+            # The duckduckgo_search library talks to DuckDuckGo's JSON
+            # endpoint, so there is no result page to download and parse
+            try:
+                from duckduckgo_search import DDGS
+
+                results = [
+                    {'title': r.get('title', ''), 'url': r.get('href', ''), 'snippet': r.get('body', '')}
+                    for r in DDGS().text(query, max_results=max_results)
+                ]
+                return {
+                    'status': 'success',
+                    'results': results
+                }
+            except Exception:
+                pass  # e.g. rate limited; fall back to the HTML endpoint
+
+        try:
+            with _SESSION.get(
+                "https://duckduckgo.com/html/", params={'q': query}, stream=True, timeout=_TIMEOUT
+            ) as response:
+                if response.status_code != 200:
+                    return {
+                        'status': 'error',
+                        'error': f"DuckDuckGo returned HTTP {response.status_code}"
+                    }
+                if _HAS_LXML:
+                    nodes = itertools.islice(_iter_ddg_results(response), max_results)
+                    results = [info for info in map(_ddg_result_info, nodes) if info]
+                else:
+                    results = self._parse_results(response.text, max_results)
+            
+            # The rate-limit and anomaly pages are served without any results;
+            # report them as errors so no cache keeps the empty answer
+            if not results:
+                return {
+                    'status': 'error',
+                    'error': "No results found on the DuckDuckGo page (possibly rate limited)"
+                }
+            
+            return {
+                'status': 'success',
+                'results': results
+            }
+            
+        except Exception as e:
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+
     def forward(self, query: str, max_results: Optional[int] = 5) -> str:
         """
         Perform a web search using DuckDuckGo
@@ -332,40 +835,10 @@ class DuckDuckGoSearchTool(Tool):
         Returns:
             str: JSON string containing search results
         """
-        search_url = f"https://duckduckgo.com/html/?q={query}"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        
-        try:
-            response = requests.get(search_url, headers=headers)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            results = []
-            for result in soup.select('.result')[:max_results]:
-                title_elem = result.find('a', class_='result__a')
-                snippet_elem = result.find('a', class_='result__snippet')
-                
-                if title_elem:
-                    result_info = {
-                        'title': title_elem.text.strip(),
-                        'url': title_elem['href'],
-                        'snippet': snippet_elem.text.strip() if snippet_elem else ""
-                    }
-                    results.append(result_info)
-            
-            return json.dumps({
-                'status': 'success',
-                'results': results
-            })
-            
-        except Exception as e:
-            return json.dumps({
-                'status': 'error',
-                'error': str(e)
-            })
+        return dumps(self._search(query, 5 if max_results is None else max_results))
 
 # Create instances of the tools
 duckduckgo_search = DuckDuckGoSearchTool()
 search_huggingface_spaces = HuggingFaceSpaceSearchTool()
-validate_space = SpaceValidatorTool() 
\ No newline at end of file
+validate_space = SpaceValidatorTool()
+search_and_validate_spaces = SpaceSearchAndValidateTool() 
\ No newline at end of file
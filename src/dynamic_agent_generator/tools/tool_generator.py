@@ -3,6 +3,7 @@ import os
 import json
 from typing import Optional, Dict, Any, Union
 import black
+from .._json import dumps, loads
 
 class ToolGenerator(Tool):
     """Tool for generating custom tools based on requirements"""
@@ -273,7 +274,7 @@ class {tool_name}Tool(Tool):
             with open(init_file, mode) as f:
                 f.write(init_content)
             
-            return json.dumps({
+            return dumps({
                 "status": "success",
                 "message": f"Tool {tool_name} generated successfully",
                 "tool_path": tool_file,
@@ -283,7 +284,7 @@ class {tool_name}Tool(Tool):
             })
             
         except Exception as e:
-            return json.dumps({
+            return dumps({
                 "status": "error",
                 "error": str(e)
             })
@@ -326,7 +327,7 @@ class {tool_name}Tool(Tool):
                 ]
             )
             result = agent.run(implementation_prompt)
-            return json.loads(result)
+            return loads(result)
             
         except Exception as e:
             print(f"Failed to generate implementation: {str(e)}")
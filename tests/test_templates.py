@@ -0,0 +1,25 @@
+import ast
+
+import pytest
+
+from dynamic_agent_generator.tools._templates import render_tool
+
+
+@pytest.mark.parametrize("description", [
+    'a "quoted" desc',
+    "multi-line\ndescription",
+    'ends with a quote"',
+    'triple """ quotes and a \\ backslash',
+])
+def test_render_tool_escapes_description(description):
+    source = render_tool("Example", description)
+    tree = ast.parse(source)
+
+    cls = next(node for node in tree.body if isinstance(node, ast.ClassDef))
+    assert ast.get_docstring(cls, clean=False) == description
+    assigned = {
+        node.targets[0].id: node.value.value
+        for node in cls.body
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant)
+    }
+    assert assigned["description"] == description